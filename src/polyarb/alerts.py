@@ -1,10 +1,13 @@
 """
 Alert system for notifications (Discord, Telegram)
 """
+import heapq
+from operator import attrgetter
 import aiohttp
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
+from .api.http import create_session
 from .models import ArbitrageOpportunity
 from .config import config
 
@@ -12,29 +15,35 @@ from .config import config
 class AlertManager:
     """Async alert manager for multiple notification channels"""
 
-    def __init__(self):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
         self.discord_url = config.alerts.discord_webhook
         self.telegram_token = config.alerts.telegram_token
         self.telegram_chat_id = config.alerts.telegram_chat_id
         self.enabled = config.alerts.enabled
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session = session
+        self._owns_session = session is None
 
     async def __aenter__(self):
-        self._session = aiohttp.ClientSession()
+        if not self._session:
+            self._session = create_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._session:
+        # A session passed in by the caller is theirs to close
+        if self._session and self._owns_session:
             await self._session.close()
+            self._session = None
 
     @property
     def session(self) -> aiohttp.ClientSession:
         if not self._session:
-            self._session = aiohttp.ClientSession()
+            self._session = create_session()
         return self._session
 
-    async def send_discord(self, opp: ArbitrageOpportunity) -> bool:
-        """Send alert to Discord webhook"""
+    async def send_discord(
+        self, opp: ArbitrageOpportunity, timestamp: Optional[str] = None
+    ) -> bool:
+        """Send alert to Discord webhook (timestamp: ISO string, default now)"""
         if not self.discord_url:
             return False
 
@@ -59,7 +68,7 @@ class AlertManager:
                 {"name": "Category", "value": opp.category or "Unknown", "inline": True},
             ],
             "url": opp.url,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
             "footer": {"text": f"Market Type: {opp.market_type.value}"},
         }
 
@@ -120,9 +129,12 @@ class AlertManager:
         if not self.enabled:
             return
 
+        # One timestamp per batch rather than per channel
+        timestamp = datetime.now(timezone.utc).isoformat()
+
         results = []
         if self.discord_url:
-            results.append(await self.send_discord(opp))
+            results.append(await self.send_discord(opp, timestamp))
         if self.telegram_token:
             results.append(await self.send_telegram(opp))
 
@@ -139,7 +151,8 @@ Found {len(opportunities)} opportunities in {scan_duration:.1f}s
 
 Top 3:
 """
-        for i, opp in enumerate(opportunities[:3], 1):
+        top = heapq.nlargest(3, opportunities, key=attrgetter("profit_percent"))
+        for i, opp in enumerate(top, 1):
             summary += f"{i}. {opp.profit_percent:.2f}% - {opp.question[:40]}...\n"
 
         if self.telegram_token and self.telegram_chat_id:
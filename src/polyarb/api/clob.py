@@ -3,34 +3,59 @@ CLOB API Client - Order book and pricing data
 https://clob.polymarket.com
 """
 import asyncio
-from typing import List, Optional, Dict, Tuple
+import random
+import time
+from operator import attrgetter
+from typing import Any, List, Optional, Dict, Tuple
 import aiohttp
 
+from .. import fastjson
 from ..config import config
+from .http import create_session, RateLimiter
 from ..models import Token, OrderBook, OrderBookLevel
 
+# Responses worth retrying: rate limited or transient server trouble
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Upper bound on a server-requested Retry-After wait (seconds)
+MAX_RETRY_AFTER = 30.0
+
 
 class CLOBClient:
     """Async client for Polymarket CLOB API (order book/pricing)"""
 
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
         self.base_url = base_url or config.api.clob_api
         self.timeout = aiohttp.ClientTimeout(total=10)
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session = session
+        self._owns_session = session is None
         self._semaphore = asyncio.Semaphore(config.api.max_concurrent)
+        self._rate_limiter = RateLimiter(config.api.rate_limit)
+        # (token_id, side) -> (fetched_at, price)
+        self._price_cache: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._price_cache_ttl = config.api.price_cache_ttl
+        self._max_retries = config.api.max_retries
+        self._retry_backoff = config.api.retry_backoff
+        self._retry_backoff_max = config.api.retry_backoff_max
 
     async def __aenter__(self):
-        self._session = aiohttp.ClientSession(timeout=self.timeout)
+        if not self._session:
+            self._session = create_session(self.timeout)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._session:
+        # A session passed in by the caller is theirs to close
+        if self._session and self._owns_session:
             await self._session.close()
+            self._session = None
 
     @property
     def session(self) -> aiohttp.ClientSession:
         if not self._session:
-            self._session = aiohttp.ClientSession(timeout=self.timeout)
+            self._session = create_session(self.timeout)
         return self._session
 
     async def get_price(self, token_id: str, side: str = "buy") -> Optional[float]:
@@ -38,49 +63,184 @@ class CLOBClient:
         Get best price for a token.
         side: "buy" for best ask, "sell" for best bid
         """
-        async with self._semaphore:
-            try:
-                async with self.session.get(
-                    f"{self.base_url}/price",
-                    params={"token_id": token_id, "side": side},
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        price = data.get("price")
-                        return float(price) if price else None
-            except Exception:
-                pass
+        cached = self._get_cached_price(token_id, side)
+        if cached is not None:
+            return cached
+
+        data = await self._request_json(
+            "get", "/price", params={"token_id": token_id, "side": side}
+        )
+        if not isinstance(data, dict):
+            return None
+        try:
+            price = float(data["price"]) if data.get("price") else None
+        except (TypeError, ValueError):
+            return None
+        self._cache_price(token_id, side, price)
+        return price
+
+    async def _request_json(self, method: str, path: str, **kwargs) -> Optional[Any]:
+        """
+        Send a request and return the decoded JSON body, or None on failure.
+
+        Transient failures (429, 5xx, connection errors, timeouts) are
+        retried with exponential backoff and jitter, honouring a 429's
+        Retry-After. The concurrency slot is released while backing off.
+        """
+        send = getattr(self.session, method)
+        for attempt in range(self._max_retries + 1):
+            retry_after = None
+            async with self._semaphore:
+                await self._rate_limiter.acquire()
+                try:
+                    async with send(
+                        f"{self.base_url}{path}", timeout=self.timeout, **kwargs
+                    ) as response:
+                        if response.status == 200:
+                            return fastjson.loads(await response.read())
+                        if response.status not in RETRY_STATUSES:
+                            return None
+                        retry_after = self._parse_retry_after(response)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+                except Exception:
+                    return None
+
+            if attempt == self._max_retries:
+                break
+            if retry_after is None:
+                backoff = min(self._retry_backoff * 2 ** attempt, self._retry_backoff_max)
+                retry_after = backoff * (0.5 + random.random() / 2)
+            await asyncio.sleep(retry_after)
+        return None
+
+    @staticmethod
+    def _parse_retry_after(response) -> Optional[float]:
+        """Seconds from a Retry-After header (delta-seconds form only)"""
+        value = response.headers.get("Retry-After")
+        try:
+            return min(max(float(value), 0.0), MAX_RETRY_AFTER) if value else None
+        except ValueError:
+            return None
+
+    def _get_cached_price(self, token_id: str, side: str) -> Optional[float]:
+        """Return a cached price if it is younger than the TTL"""
+        entry = self._price_cache.get((token_id, side))
+        if entry and time.monotonic() - entry[0] < self._price_cache_ttl:
+            return entry[1]
         return None
 
+    def _cache_price(self, token_id: str, side: str, price: Optional[float]):
+        """Cache a fetched price (missing prices are not cached)"""
+        if price is not None and self._price_cache_ttl > 0:
+            self._price_cache[(token_id, side)] = (time.monotonic(), price)
+
     async def get_prices_batch(
         self, token_ids: List[str], side: str = "buy"
     ) -> Dict[str, Optional[float]]:
-        """Get prices for multiple tokens concurrently"""
-        tasks = [self.get_price(tid, side) for tid in token_ids]
+        """
+        Get prices for multiple tokens on one side.
+        See get_prices_bulk for batching and caching.
+        """
+        prices = await self.get_prices_bulk([(tid, side) for tid in token_ids])
+        return {tid: prices.get((tid, side)) for tid in token_ids}
+
+    async def get_quotes_batch(
+        self, token_ids: List[str]
+    ) -> Tuple[Dict[str, Optional[float]], Dict[str, Optional[float]]]:
+        """
+        Get best ask and best bid for multiple tokens in one request.
+        Returns (asks, bids), each keyed by token_id.
+        """
+        pairs = [(tid, side) for tid in token_ids for side in ("buy", "sell")]
+        prices = await self.get_prices_bulk(pairs)
+        asks = {tid: prices.get((tid, "buy")) for tid in token_ids}
+        bids = {tid: prices.get((tid, "sell")) for tid in token_ids}
+        return asks, bids
+
+    async def get_prices_bulk(
+        self, pairs: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Optional[float]]:
+        """
+        Get prices for (token_id, side) pairs.
+
+        Uses the batch /prices endpoint (one POST per chunk of pairs, both
+        sides in the same payload) and falls back to per-token /price
+        requests for any chunk it rejects. Prices fetched within the last
+        price_cache_ttl seconds are served from cache without a request.
+        """
+        prices = {}
+        missing = []
+        for pair in pairs:
+            cached = self._get_cached_price(*pair)
+            if cached is None:
+                missing.append(pair)
+            else:
+                prices[pair] = cached
+
+        if not missing:
+            return prices
+
+        size = config.api.prices_batch_size
+        chunks = [missing[i:i + size] for i in range(0, len(missing), size)]
+        results = await asyncio.gather(*(self._post_prices(c) for c in chunks))
+
+        failed = [chunk for chunk, result in zip(chunks, results) if result is None]
+        fallbacks = await asyncio.gather(
+            *(self._get_prices_individually(c) for c in failed)
+        )
+
+        for result in (*results, *fallbacks):
+            if result:
+                prices.update(result)
+        return prices
+
+    async def _post_prices(
+        self, pairs: List[Tuple[str, str]]
+    ) -> Optional[Dict[Tuple[str, str], Optional[float]]]:
+        """
+        Fetch one chunk of prices via POST /prices.
+        Returns None if the batch request fails.
+        """
+        payload = [{"token_id": tid, "side": side.upper()} for tid, side in pairs]
+
+        data = await self._request_json("post", "/prices", json=payload)
+        if not isinstance(data, dict):
+            return None
+
+        prices = {}
+        for tid, side in pairs:
+            price = (data.get(tid) or {}).get(side.upper())
+            try:
+                price = float(price) if price else None
+            except (TypeError, ValueError):
+                price = None
+            prices[(tid, side)] = price
+            self._cache_price(tid, side, price)
+        return prices
+
+    async def _get_prices_individually(
+        self, pairs: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Optional[float]]:
+        """Get prices one /price request per pair, concurrently"""
+        tasks = [self.get_price(tid, side) for tid, side in pairs]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         prices = {}
-        for tid, result in zip(token_ids, results):
+        for pair, result in zip(pairs, results):
             if isinstance(result, Exception):
-                prices[tid] = None
+                prices[pair] = None
             else:
-                prices[tid] = result
+                prices[pair] = result
 
         return prices
 
     async def get_order_book(self, token_id: str) -> Optional[OrderBook]:
         """Get full order book for a token"""
-        async with self._semaphore:
-            try:
-                async with self.session.get(
-                    f"{self.base_url}/book", params={"token_id": token_id}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_order_book(token_id, data)
-            except Exception:
-                pass
-        return None
+        data = await self._request_json("get", "/book", params={"token_id": token_id})
+        if not isinstance(data, dict):
+            return None
+        return self._parse_order_book(token_id, data)
 
     def _parse_order_book(self, token_id: str, data: Dict) -> OrderBook:
         """Parse raw order book data"""
@@ -103,26 +263,74 @@ class CLOBClient:
             except (KeyError, ValueError):
                 continue
 
-        # Sort: bids descending (best bid first), asks ascending (best ask first)
-        bids.sort(key=lambda x: x.price, reverse=True)
-        asks.sort(key=lambda x: x.price)
+        # Best level first: bids descending, asks ascending
+        bids = self._best_first(bids, descending=True)
+        asks = self._best_first(asks, descending=False)
 
         return OrderBook(token_id=token_id, bids=bids, asks=asks)
 
+    @staticmethod
+    def _best_first(
+        levels: List[OrderBookLevel], descending: bool
+    ) -> List[OrderBookLevel]:
+        """
+        Order levels best-first without sorting when the server already
+        sent them monotonic (the CLOB lists books best-last, so this is
+        normally an O(N) reverse). Falls back to a sort otherwise.
+        """
+        prices = [level.price for level in levels]
+        if all(a <= b for a, b in zip(prices, prices[1:])):
+            ascending = levels
+        elif all(a >= b for a, b in zip(prices, prices[1:])):
+            ascending = levels[::-1]
+        else:
+            return sorted(levels, key=attrgetter("price"), reverse=descending)
+
+        return ascending[::-1] if descending else ascending
+
     async def get_order_books_batch(
         self, token_ids: List[str]
     ) -> Dict[str, Optional[OrderBook]]:
-        """Get order books for multiple tokens concurrently"""
-        tasks = [self.get_order_book(tid) for tid in token_ids]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        """
+        Get order books for multiple tokens.
+        Uses POST /books per chunk, falling back to per-token /book requests.
+        """
+        if not token_ids:
+            return {}
+
+        size = config.api.prices_batch_size
+        chunks = [token_ids[i:i + size] for i in range(0, len(token_ids), size)]
+        results = await asyncio.gather(*(self._post_books(c) for c in chunks))
+
+        failed = [tid for chunk, result in zip(chunks, results) if result is None for tid in chunk]
+        fallback = await asyncio.gather(
+            *(self.get_order_book(tid) for tid in failed), return_exceptions=True
+        )
 
         books = {}
-        for tid, result in zip(token_ids, results):
-            if isinstance(result, Exception):
-                books[tid] = None
-            else:
-                books[tid] = result
+        for result in results:
+            if result:
+                books.update(result)
+        for tid, result in zip(failed, fallback):
+            books[tid] = None if isinstance(result, Exception) else result
+
+        return {tid: books.get(tid) for tid in token_ids}
 
+    async def _post_books(self, token_ids: List[str]) -> Optional[Dict[str, OrderBook]]:
+        """
+        Fetch one chunk of order books via POST /books.
+        Returns None if the batch request fails.
+        """
+        payload = [{"token_id": tid} for tid in token_ids]
+
+        data = await self._request_json("post", "/books", json=payload)
+        if not isinstance(data, list):
+            return None
+
+        books = {}
+        for raw in data:
+            if isinstance(raw, dict) and raw.get("asset_id"):
+                books[raw["asset_id"]] = self._parse_order_book(raw["asset_id"], raw)
         return books
 
     async def get_spread(self, token_id: str) -> Optional[Tuple[float, float, float]]:
@@ -2,35 +2,70 @@
 Gamma API Client - Market discovery and metadata
 https://gamma-api.polymarket.com
 """
-import json
 import asyncio
-from typing import List, Optional, Dict, Any
+import re
+import time
+from typing import List, Optional, Dict, Any, Tuple
 import aiohttp
 
+from .. import fastjson
 from ..config import config
+from .http import create_session
 from ..models import Market, Token, MarketType
 
+# Category keywords matched against a market's group title or slug
+_SPORTS_RE = re.compile(r"nfl|nba", re.IGNORECASE)
+_POLITICS_RE = re.compile(r"election|president", re.IGNORECASE)
+
 
 class GammaClient:
     """Async client for Polymarket Gamma API (market discovery)"""
 
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
         self.base_url = base_url or config.api.gamma_api
         self.timeout = aiohttp.ClientTimeout(total=config.api.timeout)
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session = session
+        self._owns_session = session is None
+        # raw clobTokenIds string -> parsed ids (immutable per market, so
+        # repeated scans skip the JSON parse)
+        self._token_ids_cache: Dict[str, Tuple[str, ...]] = {}
+        # (path, params) -> (validator headers, parsed body) for conditional GETs
+        self._response_cache: Dict[Tuple, Tuple[Dict[str, str], Any]] = {}
+        # limit -> (fetched_at, parsed markets); metadata changes on the
+        # order of minutes, so repeat scans skip the request entirely
+        self._markets_cache: Dict[int, Tuple[float, List[Market]]] = {}
 
     async def __aenter__(self):
-        self._session = aiohttp.ClientSession(timeout=self.timeout)
+        await self.connect()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._session:
+        await self.close()
+
+    async def connect(self):
+        """
+        Open the pooled session (see create_session). Long-lived callers
+        can connect once and share the client instead of using it as a
+        context manager per scan.
+        """
+        if not self._session:
+            self._session = create_session(self.timeout)
+
+    async def close(self):
+        """Close the session if this client created it"""
+        # A session passed in by the caller is theirs to close
+        if self._session and self._owns_session:
             await self._session.close()
+            self._session = None
 
     @property
     def session(self) -> aiohttp.ClientSession:
         if not self._session:
-            self._session = aiohttp.ClientSession(timeout=self.timeout)
+            self._session = create_session(self.timeout)
         return self._session
 
     async def fetch_markets(
@@ -53,11 +88,7 @@ class GammaClient:
             "ascending": str(ascending).lower(),
         }
 
-        async with self.session.get(
-            f"{self.base_url}/markets", params=params
-        ) as response:
-            response.raise_for_status()
-            return await response.json()
+        return await self._get_json("/markets", params)
 
     async def fetch_events(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -66,39 +97,68 @@ class GammaClient:
         """
         params = {"limit": limit, "closed": "false", "active": "true"}
 
+        return await self._get_json("/events", params)
+
+    async def _get_json(self, path: str, params: Dict[str, Any]) -> Any:
+        """
+        GET a JSON resource, revalidating with ETag / Last-Modified.
+        On 304 Not Modified the previously parsed body is reused.
+        """
+        key = (path, tuple(sorted(params.items())))
+        cached = self._response_cache.get(key)
+        headers = cached[0] if cached else None
+
         async with self.session.get(
-            f"{self.base_url}/events", params=params
+            f"{self.base_url}{path}", params=params, headers=headers, timeout=self.timeout
         ) as response:
+            if response.status == 304 and cached:
+                return cached[1]
             response.raise_for_status()
-            return await response.json()
+            # Parse the raw bytes: skips aiohttp's str decode, and orjson
+            # reads UTF-8 directly
+            body = fastjson.loads(await response.read())
+
+            validators = {}
+            etag = response.headers.get("ETag")
+            if etag:
+                validators["If-None-Match"] = etag
+            last_modified = response.headers.get("Last-Modified")
+            if last_modified:
+                validators["If-Modified-Since"] = last_modified
+            if validators:
+                self._response_cache[key] = (validators, body)
+
+            return body
 
     def parse_market(self, raw: Dict[str, Any]) -> Optional[Market]:
         """Parse raw market data into Market model"""
+        g = raw.get
+
+        # Cheap flag checks first so dead markets skip all JSON parsing
         # Skip if no order book
-        if not raw.get("enableOrderBook"):
+        if not g("enableOrderBook"):
+            return None
+
+        # Skip if closed or inactive
+        closed = g("closed", False)
+        active = g("active", True)
+        if closed or not active:
             return None
 
         # Parse token IDs
-        clob_ids = raw.get("clobTokenIds", "")
+        clob_ids = g("clobTokenIds", "")
         if isinstance(clob_ids, str):
-            try:
-                clob_ids = json.loads(clob_ids)
-            except (json.JSONDecodeError, TypeError):
-                clob_ids = [t.strip() for t in clob_ids.split(",") if t.strip()]
+            clob_ids = self._parse_token_ids(clob_ids)
 
         if not clob_ids:
             return None
 
-        # Skip if closed or inactive
-        if raw.get("closed") or not raw.get("active", True):
-            return None
-
         # Determine market type
-        outcomes = raw.get("outcomes", "")
+        outcomes = g("outcomes", "")
         if isinstance(outcomes, str):
             try:
-                outcomes = json.loads(outcomes)
-            except:
+                outcomes = fastjson.loads(outcomes)
+            except (fastjson.JSONDecodeError, TypeError):
                 outcomes = []
 
         # Create tokens
@@ -121,51 +181,93 @@ class GammaClient:
 
         # Extract category from tags or group
         category = ""
-        tags = raw.get("tags", [])
+        tags = g("tags")
         if isinstance(tags, list) and tags:
-            category = tags[0].lower() if tags else ""
-        group_slug = raw.get("groupItemTitle", "") or raw.get("slug", "")
-        if "nfl" in group_slug.lower() or "nba" in group_slug.lower():
+            category = tags[0].lower()
+        slug = g("slug") or ""
+        group_slug = g("groupItemTitle") or slug
+        if _SPORTS_RE.search(group_slug):
             category = "sports"
-        elif "election" in group_slug.lower() or "president" in group_slug.lower():
+        elif _POLITICS_RE.search(group_slug):
             category = "politics"
 
         return Market(
-            market_id=str(raw.get("id", "")),
-            condition_id=raw.get("conditionId", ""),
-            question=raw.get("question", "Unknown"),
-            slug=raw.get("slug", ""),
+            market_id=str(g("id", "")),
+            condition_id=g("conditionId", ""),
+            question=g("question", "Unknown"),
+            slug=slug,
             tokens=tokens,
-            liquidity=float(raw.get("liquidityNum", 0) or 0),
-            volume=float(raw.get("volumeNum", 0) or 0),
+            liquidity=float(g("liquidityNum") or 0.0),
+            volume=float(g("volumeNum") or 0.0),
             category=category,
             market_type=market_type,
-            active=raw.get("active", True),
-            closed=raw.get("closed", False),
-            neg_risk=raw.get("negRisk", False) or len(clob_ids) > 2,
+            active=active,
+            closed=closed,
+            neg_risk=g("negRisk", False) or len(clob_ids) > 2,
         )
 
+    def _parse_token_ids(self, raw_ids: str) -> Tuple[str, ...]:
+        """Parse a clobTokenIds string (JSON list or comma-separated), memoized"""
+        cached = self._token_ids_cache.get(raw_ids)
+        if cached is not None:
+            return cached
+
+        try:
+            ids = fastjson.loads(raw_ids)
+        except (fastjson.JSONDecodeError, TypeError):
+            ids = [t.strip() for t in raw_ids.split(",") if t.strip()]
+
+        parsed = tuple(ids) if isinstance(ids, list) else ()
+        self._token_ids_cache[raw_ids] = parsed
+        return parsed
+
     async def get_all_markets(self, limit: int = 500) -> List[Market]:
-        """Fetch and parse all active markets"""
-        raw_markets = await self.fetch_markets(limit=limit)
-        markets = []
+        """
+        Fetch and parse all active markets.
+        Results are reused for markets_cache_ttl seconds.
+        """
+        ttl = config.api.markets_cache_ttl
+        cached = self._markets_cache.get(limit)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return list(cached[1])
+
+        try:
+            raw_markets = await self.fetch_markets(limit=limit)
+        except Exception:
+            self._markets_cache.pop(limit, None)
+            raise
 
-        for raw in raw_markets:
-            market = self.parse_market(raw)
-            if market:
-                markets.append(market)
+        # Parsing a full listing is pure CPU work; run it off the event loop
+        # so WebSocket traffic keeps flowing meanwhile
+        markets = await asyncio.to_thread(self._parse_markets, raw_markets)
 
-        return markets
+        if ttl > 0:
+            self._markets_cache[limit] = (time.monotonic(), markets)
+        return list(markets)
+
+    def _parse_markets(self, raw_markets: List[Dict[str, Any]]) -> List[Market]:
+        """Parse a listing, dropping markets parse_market rejects"""
+        return [m for m in map(self.parse_market, raw_markets) if m]
+
+    async def get_markets_partitioned(
+        self, limit: int = 500
+    ) -> Dict[MarketType, List[Market]]:
+        """
+        Fetch active markets split by type in one pass.
+        Returns {MarketType.BINARY: [...], MarketType.NEGRISK: [...]}.
+        """
+        partitioned = {MarketType.BINARY: [], MarketType.NEGRISK: []}
+        for market in await self.get_all_markets(limit):
+            partitioned[market.market_type].append(market)
+        return partitioned
 
     async def get_binary_markets(self, limit: int = 500) -> List[Market]:
-        """Get only binary (YES/NO) markets"""
-        markets = await self.get_all_markets(limit)
-        return [m for m in markets if m.market_type == MarketType.BINARY]
+        """Get only binary (YES/NO) markets (prefer get_markets_partitioned)"""
+        return (await self.get_markets_partitioned(limit))[MarketType.BINARY]
 
     async def get_negrisk_markets(self, limit: int = 500) -> List[Market]:
-        """Get only NegRisk (multi-outcome) markets"""
-        markets = await self.get_all_markets(limit)
-        return [m for m in markets if m.market_type == MarketType.NEGRISK]
+        """Get only NegRisk (multi-outcome) markets (prefer get_markets_partitioned)"""
+        return (await self.get_markets_partitioned(limit))[MarketType.NEGRISK]
 
     async def get_negrisk_events(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -0,0 +1,72 @@
+"""
+Shared HTTP session setup and rate limiting for the REST clients
+"""
+import asyncio
+import socket
+import time
+from typing import Optional
+
+import aiohttp
+
+from .. import fastjson
+from ..config import config
+
+
+def create_session(timeout: Optional[aiohttp.ClientTimeout] = None) -> aiohttp.ClientSession:
+    """
+    Create a ClientSession backed by a keep-alive connection pool.
+
+    One session can be shared by GammaClient, CLOBClient and AlertManager
+    (pass it as `session=`) so they reuse a single pool and DNS cache.
+
+    Connections are kept open between requests so repeated calls to the
+    same host skip the TCP + TLS handshake. Connections per host are
+    capped, so a burst of concurrent requests queues onto a few warm
+    connections instead of opening a new socket for each one.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=config.api.pool_size,
+        limit_per_host=config.api.pool_size_per_host,
+        keepalive_timeout=config.api.keepalive_timeout,
+        ttl_dns_cache=config.api.dns_cache_ttl,
+        family=socket.AF_INET if config.api.force_ipv4 else 0,
+    )
+    if timeout is None:
+        timeout = aiohttp.ClientTimeout(total=config.api.timeout)
+    return aiohttp.ClientSession(
+        connector=connector, timeout=timeout, json_serialize=fastjson.dumps
+    )
+
+
+class RateLimiter:
+    """
+    Async token bucket.
+
+    acquire() returns immediately while tokens are available and only
+    sleeps when the request rate would exceed `rate` per second.
+    A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        """Take one token, waiting only if the bucket is empty"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self.rate)
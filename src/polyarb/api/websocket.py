@@ -2,18 +2,89 @@
 WebSocket Client - Real-time price streaming
 wss://ws-subscriptions-clob.polymarket.com
 """
-import json
 import asyncio
-from typing import List, Optional, Callable, Dict, Any, Set
-from datetime import datetime
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Callable, ClassVar, Dict, Any, Iterator, Set, Tuple
 from dataclasses import dataclass, field
+import numpy as np
 import websockets
 from websockets.exceptions import ConnectionClosed
 
+from .. import fastjson
 from ..config import config
 
 
-@dataclass
+logger = logging.getLogger("polyarb.ws")
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of raising"""
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def start_log_listener():
+    """
+    Route WebSocket log records through a bounded queue to a background
+    thread that writes them to stdout, so reconnect storms never block the
+    event loop on console I/O. Skipped if the application configured the
+    "polyarb.ws" logger itself.
+
+    Application-level setup: called by the CLI entry points, never by the
+    library classes. Records still propagate to any root handlers.
+    """
+    global _log_listener
+    if _log_listener is not None or logger.handlers:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter("[WS] %(message)s"))
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=10_000)
+
+    logger.addHandler(_DroppingQueueHandler(records))
+    logger.setLevel(logging.INFO)
+
+    _log_listener = logging.handlers.QueueListener(records, stream)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+
+def _intern_token(token_id: Any) -> Any:
+    """
+    Interned token id, so every registry shares one copy of each long
+    decimal asset id. Applied at registration only; inbound ids are looked
+    up as they arrive. Non-string values are returned unchanged.
+    """
+    return sys.intern(token_id) if type(token_id) is str else token_id
+
+
+@lru_cache(maxsize=32)
+def _subscription_message(token_ids: Tuple[str, ...], operation: Optional[str] = None) -> str:
+    """
+    Serialized subscription frame, cached so resubscribing the same token
+    set (e.g. on every reconnect) reuses the encoded string.
+    operation None is the initial MARKET subscription.
+    """
+    if operation is None:
+        msg = {"type": "MARKET", "assets_ids": list(token_ids)}
+    else:
+        msg = {"assets_ids": list(token_ids), "operation": operation}
+    return fastjson.dumps(msg)
+
+
+@dataclass(slots=True)
 class MarketState:
     """Tracks state of a binary market for arbitrage detection"""
     market_id: str
@@ -27,11 +98,22 @@ class MarketState:
     no_ask: Optional[float] = None
     yes_bid: Optional[float] = None
     no_bid: Optional[float] = None
-    last_update: datetime = field(default_factory=datetime.now)
+    # time.monotonic() of the last price update (staleness only, not wall time)
+    last_update: float = field(default_factory=time.monotonic)
+    # Derived from slug once, not per opportunity payload
+    url: str = field(init=False, default="")
+
+    # Opportunity types reported by the checks
+    UNDERPRICED: ClassVar[str] = "BINARY_UNDERPRICED"
+    OVERPRICED: ClassVar[str] = "BINARY_OVERPRICED"
+
+    def __post_init__(self):
+        self.url = f"https://polymarket.com/event/{self.slug}" if self.slug else ""
 
     @property
-    def url(self) -> str:
-        return f"https://polymarket.com/event/{self.slug}" if self.slug else ""
+    def key_id(self) -> str:
+        """Identifier used in opportunity dedup keys"""
+        return self.market_id
 
     def update_price(self, token_id: str, bid: Optional[float], ask: Optional[float]):
         """Update price for a token"""
@@ -45,10 +127,15 @@ class MarketState:
                 self.no_bid = bid
             if ask is not None:
                 self.no_ask = ask
-        self.last_update = datetime.now()
+        self.last_update = time.monotonic()
 
     def check_underpriced(self, min_profit: float) -> Optional[Dict]:
         """Check if market is underpriced (YES_ask + NO_ask < $1)"""
+        result = self.eval_underpriced(min_profit)
+        return self.underpriced_payload(*result) if result else None
+
+    def eval_underpriced(self, min_profit: float) -> Optional[Tuple[float, float, float]]:
+        """Numeric underpriced check: (total_cost, profit, profit_percent) or None"""
         if self.yes_ask is None or self.no_ask is None:
             return None
         if self.yes_ask <= 0 or self.no_ask <= 0:
@@ -64,8 +151,12 @@ class MarketState:
         if profit_percent < min_profit:
             return None
 
+        return total_cost, profit, profit_percent
+
+    def underpriced_payload(self, total_cost: float, profit: float, profit_percent: float) -> Dict:
+        """Opportunity dict for an eval_underpriced result"""
         return {
-            "type": "BINARY_UNDERPRICED",
+            "type": self.UNDERPRICED,
             "market_id": self.market_id,
             "question": self.question,
             "url": self.url,
@@ -80,6 +171,11 @@ class MarketState:
 
     def check_overpriced(self, min_profit: float) -> Optional[Dict]:
         """Check if market is overpriced (YES_bid + NO_bid > $1)"""
+        result = self.eval_overpriced(min_profit)
+        return self.overpriced_payload(*result) if result else None
+
+    def eval_overpriced(self, min_profit: float) -> Optional[Tuple[float, float, float]]:
+        """Numeric overpriced check: (total_value, profit, profit_percent) or None"""
         if self.yes_bid is None or self.no_bid is None:
             return None
         if self.yes_bid <= 0 or self.no_bid <= 0:
@@ -95,8 +191,12 @@ class MarketState:
         if profit_percent < min_profit:
             return None
 
+        return total_value, profit, profit_percent
+
+    def overpriced_payload(self, total_value: float, profit: float, profit_percent: float) -> Dict:
+        """Opportunity dict for an eval_overpriced result"""
         return {
-            "type": "BINARY_OVERPRICED",
+            "type": self.OVERPRICED,
             "market_id": self.market_id,
             "question": self.question,
             "url": self.url,
@@ -110,40 +210,146 @@ class MarketState:
         }
 
 
-@dataclass
 class NegRiskEventState:
-    """Tracks state of a NegRisk event for arbitrage detection"""
-    event_id: str
-    title: str
-    slug: str
-    total_liquidity: float
-    # market_id -> (yes_token_id, question)
-    markets: Dict[str, tuple] = field(default_factory=dict)
-    # yes_token_id -> ask price
-    yes_prices: Dict[str, float] = field(default_factory=dict)
-    # yes_token_id -> bid price (for NO side = 1 - yes_bid)
-    yes_bids: Dict[str, float] = field(default_factory=dict)
-    last_update: datetime = field(default_factory=datetime.now)
+    """
+    Tracks state of a NegRisk event for arbitrage detection.
+
+    Keeps running totals of the YES asks and bids so each check is O(1)
+    rather than a sum over every outcome. Update prices through
+    update_price; assigning a whole new yes_prices / yes_bids mapping
+    re-totals it. Incremental updates accumulate rounding error, so the
+    totals are also re-summed every RESUM_EVERY updates and whenever an
+    outcome gets its first price. Likewise add outcomes with add_market (or assign a new
+    markets mapping) so the YES token index stays in sync.
+    """
+
+    __slots__ = (
+        "event_id",
+        "title",
+        "slug",
+        "url",
+        "total_liquidity",
+        "_markets",
+        "yes_token_ids",
+        "_yes_prices",
+        "_yes_bids",
+        "ask_total",
+        "bid_total",
+        "_updates",
+        "last_update",
+    )
+
+    # Opportunity types reported by the checks
+    UNDERPRICED = "NEGRISK_UNDERPRICED"
+    OVERPRICED = "NEGRISK_OVERPRICED"
+    # Price updates between exact re-sums of the running totals
+    RESUM_EVERY = 256
+
+    def __init__(
+        self,
+        event_id: str,
+        title: str,
+        slug: str,
+        total_liquidity: float,
+        markets: Optional[Dict[str, tuple]] = None,
+        yes_prices: Optional[Dict[str, float]] = None,
+        yes_bids: Optional[Dict[str, float]] = None,
+    ):
+        self.event_id = event_id
+        self.title = title
+        self.slug = slug
+        self.url = f"https://polymarket.com/event/{slug}" if slug else ""
+        self.total_liquidity = total_liquidity
+        # market_id -> (yes_token_id, question); also fills yes_token_ids
+        self.markets = markets if markets is not None else {}
+        # yes_token_id -> ask price
+        self.yes_prices = yes_prices if yes_prices is not None else {}
+        # yes_token_id -> bid price (for NO side = 1 - yes_bid)
+        self.yes_bids = yes_bids if yes_bids is not None else {}
+        # Updates applied since the totals were last re-summed
+        self._updates = 0
+        # time.monotonic() of the last price update
+        self.last_update = time.monotonic()
+
+    @property
+    def markets(self) -> Dict[str, tuple]:
+        return self._markets
+
+    @markets.setter
+    def markets(self, markets: Dict[str, tuple]):
+        self._markets = markets
+        # O(1) membership for update_price
+        self.yes_token_ids: Set[str] = {m[0] for m in markets.values()}
+
+    def add_market(self, market_id: str, yes_token_id: str, question: str):
+        """Add one outcome market to the event"""
+        self._markets[market_id] = (yes_token_id, question)
+        self.yes_token_ids.add(yes_token_id)
+
+    @property
+    def yes_prices(self) -> Dict[str, float]:
+        return self._yes_prices
+
+    @yes_prices.setter
+    def yes_prices(self, prices: Dict[str, float]):
+        self._yes_prices = prices
+        self.ask_total = sum(prices.values())
+
+    @property
+    def yes_bids(self) -> Dict[str, float]:
+        return self._yes_bids
+
+    @yes_bids.setter
+    def yes_bids(self, bids: Dict[str, float]):
+        self._yes_bids = bids
+        self.bid_total = sum(bids.values())
 
     @property
-    def url(self) -> str:
-        return f"https://polymarket.com/event/{self.slug}" if self.slug else ""
+    def key_id(self) -> str:
+        """Identifier used in opportunity dedup keys"""
+        return self.event_id
 
     def update_price(self, token_id: str, bid: Optional[float], ask: Optional[float]):
         """Update YES price for a token"""
-        if token_id in self.yes_prices or any(token_id == m[0] for m in self.markets.values()):
+        if token_id in self.yes_token_ids or token_id in self._yes_prices:
+            self._updates += 1
+            resum = self._updates >= self.RESUM_EVERY
+            if resum:
+                self._updates = 0
+
             if ask is not None:
-                self.yes_prices[token_id] = ask
+                prices = self._yes_prices
+                if resum or token_id not in prices:
+                    prices[token_id] = ask
+                    self.ask_total = sum(prices.values())
+                else:
+                    self.ask_total += ask - prices[token_id]
+                    prices[token_id] = ask
+            elif resum:
+                self.ask_total = sum(self._yes_prices.values())
             if bid is not None:
-                self.yes_bids[token_id] = bid
-            self.last_update = datetime.now()
+                bids = self._yes_bids
+                if resum or token_id not in bids:
+                    bids[token_id] = bid
+                    self.bid_total = sum(bids.values())
+                else:
+                    self.bid_total += bid - bids[token_id]
+                    bids[token_id] = bid
+            elif resum:
+                self.bid_total = sum(self._yes_bids.values())
+            self.last_update = time.monotonic()
 
     def check_underpriced(self, min_profit: float) -> Optional[Dict]:
         """Check if sum of all YES asks < $1"""
-        if len(self.yes_prices) < 3:
+        result = self.eval_underpriced(min_profit)
+        return self.underpriced_payload(*result) if result else None
+
+    def eval_underpriced(self, min_profit: float) -> Optional[Tuple[float, float, float]]:
+        """Numeric underpriced check: (total_cost, profit, profit_percent) or None"""
+        if len(self._yes_prices) < 3:
             return None
 
-        total_cost = sum(self.yes_prices.values())
+        total_cost = self.ask_total
         if total_cost >= 1.0:
             return None
         if total_cost <= 0.1:  # Skip if prices too low (likely no liquidity)
@@ -155,25 +361,34 @@ class NegRiskEventState:
         if profit_percent < min_profit:
             return None
 
+        return total_cost, profit, profit_percent
+
+    def underpriced_payload(self, total_cost: float, profit: float, profit_percent: float) -> Dict:
+        """Opportunity dict for an eval_underpriced result"""
         return {
-            "type": "NEGRISK_UNDERPRICED",
+            "type": self.UNDERPRICED,
             "event_id": self.event_id,
             "title": self.title,
             "url": self.url,
-            "prices": dict(self.yes_prices),
+            "prices": dict(self._yes_prices),
             "total_cost": total_cost,
             "profit": profit,
             "profit_percent": profit_percent,
             "liquidity": self.total_liquidity,
-            "num_outcomes": len(self.yes_prices),
+            "num_outcomes": len(self._yes_prices),
         }
 
     def check_overpriced(self, min_profit: float) -> Optional[Dict]:
         """Check if sum of all YES bids > $1 (sell opportunity)"""
-        if len(self.yes_bids) < 3:
+        result = self.eval_overpriced(min_profit)
+        return self.overpriced_payload(*result) if result else None
+
+    def eval_overpriced(self, min_profit: float) -> Optional[Tuple[float, float, float]]:
+        """Numeric overpriced check: (total_value, profit, profit_percent) or None"""
+        if len(self._yes_bids) < 3:
             return None
 
-        total_value = sum(self.yes_bids.values())
+        total_value = self.bid_total
         if total_value <= 1.0:
             return None
 
@@ -183,17 +398,21 @@ class NegRiskEventState:
         if profit_percent < min_profit:
             return None
 
+        return total_value, profit, profit_percent
+
+    def overpriced_payload(self, total_value: float, profit: float, profit_percent: float) -> Dict:
+        """Opportunity dict for an eval_overpriced result"""
         return {
-            "type": "NEGRISK_OVERPRICED",
+            "type": self.OVERPRICED,
             "event_id": self.event_id,
             "title": self.title,
             "url": self.url,
-            "prices": dict(self.yes_bids),
+            "prices": dict(self._yes_bids),
             "total_value": total_value,
             "profit": profit,
             "profit_percent": profit_percent,
             "liquidity": self.total_liquidity,
-            "num_outcomes": len(self.yes_bids),
+            "num_outcomes": len(self._yes_bids),
         }
 
 
@@ -206,6 +425,10 @@ class WebSocketClient:
             await ws.subscribe(token_ids)
             async for message in ws.listen():
                 process(message)
+
+    or, subscribing as part of the handshake:
+        ws = WebSocketClient()
+        await ws.connect(token_ids)
     """
 
     def __init__(self, url: Optional[str] = None):
@@ -214,8 +437,15 @@ class WebSocketClient:
         self._running = False
         self._subscribed_tokens: List[str] = []
         self._callbacks: List[Callable[[Dict], None]] = []
+        # Rebuilt whenever callbacks change (None = no callbacks)
+        self._dispatch: Optional[Callable[[Any], None]] = None
         self._reconnect_delay = 1.0
         self._max_reconnect_delay = 60.0
+        # Liveness is checked from the recv timeout instead of the library's
+        # ping task: PING after idle_ping, reconnect after max_silence
+        self._idle_ping = config.api.ws_idle_ping
+        self._max_silence = config.api.ws_max_silence
+        self._last_frame = time.monotonic()
 
     async def __aenter__(self):
         await self.connect()
@@ -224,50 +454,61 @@ class WebSocketClient:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
 
-    async def connect(self):
-        """Establish WebSocket connection"""
+    async def connect(self, token_ids: Optional[List[str]] = None):
+        """
+        Establish WebSocket connection.
+
+        The subscription (token_ids, or the current one when reconnecting)
+        is sent right after the handshake, without waiting for the server.
+        """
         try:
             self._ws = await websockets.connect(
                 self.url,
-                ping_interval=20,
-                ping_timeout=20,
+                ping_interval=None,
+                ping_timeout=None,
                 close_timeout=5,
+                # Market frames are small JSON; deflating them costs more
+                # CPU than the bandwidth it saves
+                compression=None,
+                max_size=config.api.ws_max_size,
+                max_queue=config.api.ws_max_queue,
             )
             self._running = True
             self._reconnect_delay = 1.0  # Reset on successful connect
-            print(f"[WS] Connected to {self.url}")
+            self._last_frame = time.monotonic()
+            logger.info("Connected to %s", self.url)
         except Exception as e:
-            print(f"[WS] Connection failed: {e}")
+            logger.error("Connection failed: %s", e)
             raise
 
+        tokens = token_ids if token_ids is not None else self._subscribed_tokens
+        if tokens:
+            await self.subscribe(tokens)
+
     async def close(self):
         """Close WebSocket connection"""
         self._running = False
         if self._ws:
             await self._ws.close()
             self._ws = None
-        print("[WS] Connection closed")
+        logger.info("Connection closed")
 
     async def subscribe(self, token_ids: List[str]):
         """Subscribe to market data for given tokens"""
         if not self._ws:
             raise RuntimeError("WebSocket not connected")
 
-        self._subscribed_tokens = token_ids
+        self._subscribed_tokens = list(token_ids)
 
-        msg = {"type": "MARKET", "assets_ids": token_ids}
-
-        await self._ws.send(json.dumps(msg))
-        print(f"[WS] Subscribed to {len(token_ids)} tokens")
+        await self._ws.send(_subscription_message(tuple(token_ids)))
+        logger.info("Subscribed to %d tokens", len(token_ids))
 
     async def unsubscribe(self, token_ids: List[str]):
         """Unsubscribe from specific tokens"""
         if not self._ws:
             return
 
-        msg = {"assets_ids": token_ids, "operation": "unsubscribe"}
-
-        await self._ws.send(json.dumps(msg))
+        await self._ws.send(_subscription_message(tuple(token_ids), "unsubscribe"))
         self._subscribed_tokens = [
             t for t in self._subscribed_tokens if t not in token_ids
         ]
@@ -277,64 +518,162 @@ class WebSocketClient:
         if not self._ws:
             return
 
-        msg = {"assets_ids": token_ids, "operation": "subscribe"}
-
-        await self._ws.send(json.dumps(msg))
+        await self._ws.send(_subscription_message(tuple(token_ids), "subscribe"))
         self._subscribed_tokens.extend(token_ids)
 
     def add_callback(self, callback: Callable[[Dict], None]):
         """Add callback for incoming messages"""
         self._callbacks.append(callback)
+        self._rebuild_dispatch()
 
     def remove_callback(self, callback: Callable[[Dict], None]):
         """Remove a callback"""
         if callback in self._callbacks:
             self._callbacks.remove(callback)
+            self._rebuild_dispatch()
+
+    def _rebuild_dispatch(self):
+        """
+        Bind the current callbacks into one function so listen() makes a
+        single call per message. A lone callback skips the loop entirely.
+        """
+        callbacks = tuple(self._callbacks)
+
+        if not callbacks:
+            self._dispatch = None
+            return
+
+        if len(callbacks) == 1:
+            (callback,) = callbacks
+
+            def dispatch(data):
+                try:
+                    callback(data)
+                except Exception:
+                    logger.exception("Callback error")
+        else:
+            def dispatch(data):
+                for callback in callbacks:
+                    try:
+                        callback(data)
+                    except Exception:
+                        logger.exception("Callback error")
+
+        self._dispatch = dispatch
 
     async def listen(self):
         """
         Generator that yields incoming messages.
         Handles reconnection automatically.
         """
+        async for batch in self.listen_batch():
+            for data in batch:
+                yield data
+
+    async def listen_batch(self):
+        """
+        Generator that yields lists of decoded messages: every frame that
+        was already buffered when the first one arrived. Callbacks still
+        run once per message. Handles reconnection automatically.
+        """
         while self._running:
             try:
                 if not self._ws:
+                    # Resubscribes as part of the handshake
                     await self.connect()
-                    if self._subscribed_tokens:
-                        await self.subscribe(self._subscribed_tokens)
 
-                message = await asyncio.wait_for(self._ws.recv(), timeout=30)
-                data = json.loads(message)
+                batch = await self._drain_batch()
+                if not batch:
+                    continue
 
                 # Invoke callbacks
-                for callback in self._callbacks:
-                    try:
-                        callback(data)
-                    except Exception as e:
-                        print(f"[WS] Callback error: {e}")
+                dispatch = self._dispatch
+                if dispatch is not None:
+                    for data in batch:
+                        dispatch(data)
 
-                yield data
+                yield batch
 
             except asyncio.TimeoutError:
-                # No message received, continue listening
+                # No message received: ping, or drop a silent connection
+                await self._on_idle()
                 continue
 
             except ConnectionClosed as e:
-                print(f"[WS] Connection closed: {e}")
+                logger.warning("Connection closed: %s", e)
                 self._ws = None
 
                 if self._running:
-                    print(f"[WS] Reconnecting in {self._reconnect_delay}s...")
+                    logger.info("Reconnecting in %ss...", self._reconnect_delay)
                     await asyncio.sleep(self._reconnect_delay)
                     self._reconnect_delay = min(
                         self._reconnect_delay * 2, self._max_reconnect_delay
                     )
 
             except Exception as e:
-                print(f"[WS] Error: {e}")
+                logger.error("Error: %s", e)
                 if self._running:
                     await asyncio.sleep(1)
 
+    async def _on_idle(self):
+        """
+        Keep an idle connection alive. Any frame (including the PONG reply)
+        resets the silence clock; past max_silence the connection is
+        dropped so listen() reconnects.
+        """
+        ws = self._ws
+        if ws is None:
+            return
+
+        if time.monotonic() - self._last_frame > self._max_silence:
+            logger.warning("No data for %.0fs, reconnecting", self._max_silence)
+            self._ws = None
+            try:
+                await ws.close()
+            except Exception:
+                pass
+            return
+
+        try:
+            await ws.send("PING")
+        except ConnectionClosed:
+            self._ws = None
+
+    async def _drain_batch(self, max_batch: int = 64) -> List[Any]:
+        """
+        Wait for one frame, then take whatever frames are already buffered
+        (up to max_batch) without waiting, and decode them together. Under
+        light traffic this is a single recv(). Non-JSON frames (e.g. PONG
+        replies) are skipped.
+
+        Frames are received undecoded (decode=False): fastjson parses the
+        UTF-8 bytes directly, so building an intermediate str is wasted work.
+        """
+        ws = self._ws
+        recv = ws.recv
+        frames = [await asyncio.wait_for(recv(decode=False), timeout=self._idle_ping)]
+        self._last_frame = time.monotonic()
+
+        while len(frames) < max_batch and self._buffered_frames(ws):
+            frames.append(await recv(decode=False))
+
+        batch = []
+        for frame in frames:
+            try:
+                batch.append(fastjson.loads(frame))
+            except ValueError:
+                continue
+        return batch
+
+    @staticmethod
+    def _buffered_frames(ws: Any) -> int:
+        """
+        Frames the connection has received but not yet handed to recv()
+        (0 if it does not expose its receive buffer)
+        """
+        messages = getattr(ws, "recv_messages", None)
+        return len(messages.frames) if messages is not None else 0
+
     async def listen_for_duration(self, seconds: float) -> List[Dict]:
         """Listen for a specific duration and return all messages"""
         messages = []
@@ -356,41 +695,49 @@ class PriceTracker:
 
     def __init__(self):
         self.prices: Dict[str, float] = {}
-        self.last_update: Dict[str, datetime] = {}
-        self._lock = asyncio.Lock()
-
-    async def update(self, message: Dict):
-        """Process WebSocket message and update prices"""
-        async with self._lock:
-            # Handle different message formats
-            if isinstance(message, list):
-                for item in message:
-                    await self._process_item(item)
-            else:
-                await self._process_item(message)
-
-    async def _process_item(self, item: Dict):
-        """Process a single message item"""
+        # time.monotonic() of each token's last accepted update
+        self.last_update: Dict[str, float] = {}
+
+    def update(self, message: Dict):
+        """
+        Process WebSocket message and update prices.
+        Synchronous (nothing in it awaits), so it can be registered
+        directly as a WebSocketClient callback.
+        """
+        now = time.monotonic()
+        # Handle different message formats
+        items = message if isinstance(message, list) else (message,)
+        for item in items:
+            for asset_id, price in self._iter_prices(item):
+                self.prices[asset_id] = price
+                self.last_update[asset_id] = now
+
+    def _iter_prices(self, item: Dict) -> Iterator[Tuple[str, float]]:
+        """Yield (asset_id, price) pairs from a single message item"""
         if not isinstance(item, dict):
             return
 
         # Extract asset_id and price from various message formats
         asset_id = item.get("asset_id")
+        changes = item.get("price_changes")
+
+        if not asset_id and isinstance(changes, list):
+            # price_change event: each entry names its own asset
+            for change in changes:
+                yield from self._iter_prices(change)
+            return
 
         # Check for price in different fields
         price = None
         if "price" in item:
             price = item["price"]
-        elif "price_changes" in item:
-            changes = item["price_changes"]
-            if changes and isinstance(changes, list):
-                # Get the latest price change
-                price = changes[-1].get("price")
+        elif changes and isinstance(changes, list):
+            # Get the latest price change
+            price = changes[-1].get("price")
 
         if asset_id and price is not None:
             try:
-                self.prices[asset_id] = float(price)
-                self.last_update[asset_id] = datetime.now()
+                yield asset_id, float(price)
             except (ValueError, TypeError):
                 pass
 
@@ -406,8 +753,7 @@ class PriceTracker:
         """Check if a price is stale"""
         if token_id not in self.last_update:
             return True
-        age = (datetime.now() - self.last_update[token_id]).total_seconds()
-        return age > max_age_seconds
+        return time.monotonic() - self.last_update[token_id] > max_age_seconds
 
 
 class RealtimeArbitrageDetector:
@@ -436,8 +782,26 @@ class RealtimeArbitrageDetector:
         # token_id -> event_id mapping
         self.token_to_event: Dict[str, str] = {}
 
-        # Track seen opportunities to avoid duplicates
-        self.seen_opportunities: Set[str] = set()
+        # token_id -> (MarketState or None, NegRiskEventState or None), so
+        # an update resolves everything it touches with a single lookup
+        self._token_route: Dict[str, Tuple[Optional[MarketState], Optional[NegRiskEventState]]] = {}
+
+        # Track seen opportunities to avoid duplicates. Keys embed the
+        # profit, so drift keeps minting new ones: cap the history and
+        # forget the oldest first
+        self.seen_opportunities: "OrderedDict[Tuple[str, str, int], None]" = OrderedDict()
+        self.max_seen = config.arbitrage.max_seen_opportunities
+
+        # Markets/events updated by apply_message since the last scan_dirty
+        # (dicts as insertion-ordered sets)
+        self._dirty_binary: Dict[str, MarketState] = {}
+        self._dirty_negrisk: Dict[str, NegRiskEventState] = {}
+
+        # event_type -> price extractor for schemas with a fixed shape
+        self._extractors: Dict[str, Callable[[Dict], tuple]] = {
+            "book": self._extract_book,
+            "last_trade_price": self._extract_trade,
+        }
 
         # Callbacks for opportunity detection
         self.on_opportunity: Optional[Callable[[Dict], None]] = None
@@ -464,6 +828,8 @@ class RealtimeArbitrageDetector:
         if liquidity < self.min_liquidity:
             return
 
+        yes_token_id = _intern_token(yes_token_id)
+        no_token_id = _intern_token(no_token_id)
         state = MarketState(
             market_id=market_id,
             question=question,
@@ -481,6 +847,9 @@ class RealtimeArbitrageDetector:
         self.binary_markets[market_id] = state
         self.token_to_market[yes_token_id] = market_id
         self.token_to_market[no_token_id] = market_id
+        for token_id in (yes_token_id, no_token_id):
+            event = self._token_route.get(token_id, (None, None))[1]
+            self._token_route[token_id] = (state, event)
 
     def register_negrisk_event(
         self,
@@ -503,17 +872,16 @@ class RealtimeArbitrageDetector:
 
         for m in markets:
             market_id = m.get("market_id", "")
-            yes_token_id = m.get("yes_token_id", "")
+            yes_token_id = _intern_token(m.get("yes_token_id", ""))
             question = m.get("question", "")
 
-            state.markets[market_id] = (yes_token_id, question)
+            state.add_market(market_id, yes_token_id, question)
 
-            if m.get("yes_ask") is not None:
-                state.yes_prices[yes_token_id] = m["yes_ask"]
-            if m.get("yes_bid") is not None:
-                state.yes_bids[yes_token_id] = m["yes_bid"]
+            state.update_price(yes_token_id, m.get("yes_bid"), m.get("yes_ask"))
 
             self.token_to_event[yes_token_id] = event_id
+            market = self._token_route.get(yes_token_id, (None, None))[0]
+            self._token_route[yes_token_id] = (market, state)
 
         self.negrisk_events[event_id] = state
 
@@ -549,59 +917,168 @@ class RealtimeArbitrageDetector:
         # Extract token_id and prices
         token_id = item.get("asset_id")
         if not token_id:
-            return []
+            # price_change events carry one entry per affected asset
+            changes = item.get("price_changes")
+            if isinstance(changes, list):
+                for change in changes:
+                    opportunities.extend(self._process_single_update(change))
+            return opportunities
+
+        route = self._token_route.get(token_id)
+        if route is None:
+            return opportunities
+        market, event = route
 
         # Parse bid/ask from message
         bid, ask = self._extract_prices(item)
+        candidates = []
 
-        # Check if this token belongs to a binary market
-        if token_id in self.token_to_market:
-            market_id = self.token_to_market[token_id]
-            if market_id in self.binary_markets:
-                state = self.binary_markets[market_id]
-                state.update_price(token_id, bid, ask)
-
-                # Check for opportunities
-                opp = state.check_underpriced(self.min_profit)
-                if opp:
-                    opportunities.append(opp)
-
-                opp = state.check_overpriced(self.min_profit)
-                if opp:
-                    opportunities.append(opp)
-
-        # Check if this token belongs to a NegRisk event
-        if token_id in self.token_to_event:
-            event_id = self.token_to_event[token_id]
-            if event_id in self.negrisk_events:
-                state = self.negrisk_events[event_id]
-                state.update_price(token_id, bid, ask)
-
-                # Check for opportunities
-                opp = state.check_underpriced(self.min_profit)
-                if opp:
-                    opportunities.append(opp)
-
-                opp = state.check_overpriced(self.min_profit)
-                if opp:
-                    opportunities.append(opp)
-
-        # Filter duplicates and trigger callbacks
+        # Binary market and/or NegRisk event this token belongs to
+        if market is not None:
+            market.update_price(token_id, bid, ask)
+            self._collect(market, True, True, candidates)
+        if event is not None:
+            event.update_price(token_id, bid, ask)
+            self._collect(event, True, True, candidates)
+
+        return self._emit(candidates)
+
+    def _collect(self, state: Any, under: bool, over: bool, out: List[tuple]):
+        """
+        Run a market/event's numeric checks and queue any hits as
+        (type, key_id, result, payload builder). Only the requested sides
+        are checked: underpriced reads asks only, overpriced bids only.
+        """
+        if under:
+            result = state.eval_underpriced(self.min_profit)
+            if result:
+                out.append((state.UNDERPRICED, state.key_id, result, state.underpriced_payload))
+        if over:
+            result = state.eval_overpriced(self.min_profit)
+            if result:
+                out.append((state.OVERPRICED, state.key_id, result, state.overpriced_payload))
+
+    def _emit(self, candidates: List[tuple]) -> List[Dict]:
+        """
+        Drop already-seen candidates; build, record and announce the rest.
+        Payload dicts are only built for opportunities that survive dedup.
+        """
         new_opportunities = []
-        for opp in opportunities:
-            key = f"{opp.get('type')}_{opp.get('market_id', opp.get('event_id'))}_{opp.get('profit_percent', 0):.1f}"
-            if key not in self.seen_opportunities:
-                self.seen_opportunities.add(key)
-                self.opportunities_found += 1
-                new_opportunities.append(opp)
+        for opp_type, key_id, result, build in candidates:
+            # (type, market/event, profit in 0.1% steps): a tuple hashes
+            # without formatting a string per opportunity
+            key = (opp_type, key_id, round(result[2] * 10))
+            if key in self.seen_opportunities:
+                # LRU: a still-recurring opportunity stays in the history
+                self.seen_opportunities.move_to_end(key)
+                continue
+
+            self.seen_opportunities[key] = None
+            if len(self.seen_opportunities) > self.max_seen:
+                self.seen_opportunities.popitem(last=False)
+            self.opportunities_found += 1
+
+            opp = build(*result)
+            new_opportunities.append(opp)
 
-                if self.on_opportunity:
-                    self.on_opportunity(opp)
+            if self.on_opportunity:
+                self.on_opportunity(opp)
 
         return new_opportunities
 
+    def apply_message(self, message: Any):
+        """
+        Apply a WebSocket message's prices without checking for arbitrage.
+        Touched markets and events are queued for the next scan_dirty(), so
+        a burst of updates costs one check per market rather than one per
+        message.
+        """
+        self.messages_processed += 1
+
+        items = message if isinstance(message, list) else (message,)
+        for item in items:
+            self._apply_single_update(item)
+
+    def _apply_single_update(self, item: Any):
+        """Update prices for a single item and mark its market/event dirty"""
+        if not isinstance(item, dict):
+            return
+
+        token_id = item.get("asset_id")
+        if not token_id:
+            # price_change events carry one entry per affected asset
+            changes = item.get("price_changes")
+            if isinstance(changes, list):
+                for change in changes:
+                    self._apply_single_update(change)
+            return
+
+        route = self._token_route.get(token_id)
+        if route is None:
+            return
+        market, event = route
+
+        bid, ask = self._extract_prices(item)
+
+        if market is not None:
+            market.update_price(token_id, bid, ask)
+            self._dirty_binary[market.market_id] = market
+        if event is not None:
+            event.update_price(token_id, bid, ask)
+            self._dirty_negrisk[event.event_id] = event
+
+    def scan_dirty(self) -> List[Dict]:
+        """
+        Check the markets and events touched by apply_message since the
+        last call. Returns new (deduplicated) opportunities and triggers
+        on_opportunity for each, like process_message.
+
+        Each dirty state is checked directly: building the price columns
+        for the vectorized screen costs more than it saves at burst sizes
+        (it only breaks even around 2k markets), so that is left to
+        scan_all.
+        """
+        if not self._dirty_binary and not self._dirty_negrisk:
+            return []
+
+        candidates = []
+        for state in self._dirty_binary.values():
+            self._collect(state, True, True, candidates)
+        for event in self._dirty_negrisk.values():
+            self._collect(event, True, True, candidates)
+        self._dirty_binary.clear()
+        self._dirty_negrisk.clear()
+
+        return self._emit(candidates)
+
     def _extract_prices(self, item: Dict) -> tuple:
         """Extract bid and ask prices from a WebSocket message"""
+        # Known schemas read only their own fields; anything else (including
+        # price_change entries, which carry no event_type) goes generic
+        extractor = self._extractors.get(item.get("event_type"))
+        if extractor is not None:
+            return extractor(item)
+        return self._extract_generic(item)
+
+    def _extract_book(self, item: Dict) -> tuple:
+        """book snapshot: best level of each side"""
+        # The CLOB lists books best-last, so take the best price rather
+        # than the first level (bids highest, asks lowest)
+        return (
+            self._best_level_price(item.get("bids"), max),
+            self._best_level_price(item.get("asks"), min),
+        )
+
+    @staticmethod
+    def _extract_trade(item: Dict) -> tuple:
+        """last_trade_price: the trade price, treated as the ask"""
+        try:
+            return None, float(item["price"])
+        except (KeyError, ValueError, TypeError):
+            return None, None
+
+    def _extract_generic(self, item: Dict) -> tuple:
+        """Probe every known price field"""
         bid = None
         ask = None
 
@@ -626,26 +1103,141 @@ class RealtimeArbitrageDetector:
                 pass
 
         # Handle book updates
-        if "bids" in item and item["bids"]:
-            try:
-                # Best bid is highest price
-                bids = item["bids"]
-                if isinstance(bids, list) and bids:
-                    bid = float(bids[0].get("price", 0))
-            except (ValueError, TypeError, IndexError):
-                pass
+        if item.get("bids"):
+            price = self._first_level_price(item["bids"])
+            if price is not None:
+                bid = price
 
-        if "asks" in item and item["asks"]:
-            try:
-                # Best ask is lowest price
-                asks = item["asks"]
-                if isinstance(asks, list) and asks:
-                    ask = float(asks[0].get("price", 0))
-            except (ValueError, TypeError, IndexError):
-                pass
+        if item.get("asks"):
+            price = self._first_level_price(item["asks"])
+            if price is not None:
+                ask = price
 
         return bid, ask
 
+    @staticmethod
+    def _first_level_price(levels: Any) -> Optional[float]:
+        """Price of the first level of a book side (None if absent or invalid)"""
+        if not isinstance(levels, list) or not levels:
+            return None
+        try:
+            return float(levels[0].get("price", 0))
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+    @staticmethod
+    def _best_level_price(levels: Any, best: Callable) -> Optional[float]:
+        """
+        Best price of a book side, whatever order its levels arrive in:
+        best is max for bids, min for asks (None if absent or invalid)
+        """
+        if not isinstance(levels, list) or not levels:
+            return None
+        try:
+            return best(float(level["price"]) for level in levels)
+        except (KeyError, ValueError, TypeError):
+            return None
+
+    def binary_price_columns(
+        self, states: Optional[List[MarketState]] = None
+    ) -> Dict[str, Any]:
+        """
+        Snapshot binary market prices as parallel float64 arrays (SoA).
+        Missing prices are NaN; "states" gives the MarketState per index.
+        Covers every registered market unless states is given.
+        """
+        if states is None:
+            states = list(self.binary_markets.values())
+
+        def column(attr: str) -> np.ndarray:
+            values = (getattr(s, attr) for s in states)
+            return np.fromiter(
+                (np.nan if v is None else v for v in values), np.float64, len(states)
+            )
+
+        return {
+            "states": states,
+            "yes_ask": column("yes_ask"),
+            "no_ask": column("no_ask"),
+            "yes_bid": column("yes_bid"),
+            "no_bid": column("no_bid"),
+        }
+
+    def scan_all(self) -> List[Dict]:
+        """
+        Check every registered market against current prices.
+
+        Binary markets and NegRisk events are screened in vectorized
+        passes; only the candidates are re-checked (and materialized) by
+        their state objects.
+        Does not touch deduplication state.
+        """
+        candidates = self._scan(
+            list(self.binary_markets.values()), list(self.negrisk_events.values())
+        )
+        return [build(*result) for _, _, result, build in candidates]
+
+    def _scan(
+        self, states: List[MarketState], events: List[NegRiskEventState]
+    ) -> List[tuple]:
+        """
+        Vectorized screen + exact checks over the given markets and events.
+        Returns _collect candidates (payloads not yet built).
+        """
+        candidates = []
+
+        cols = self.binary_price_columns(states)
+        yes_ask, no_ask = cols["yes_ask"], cols["no_ask"]
+        yes_bid, no_bid = cols["yes_bid"], cols["no_bid"]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cost = yes_ask + no_ask
+            under = (yes_ask > 0) & (no_ask > 0) & (cost < 1.0) & (
+                (1.0 - cost) / cost * 100 >= self.min_profit
+            )
+            value = yes_bid + no_bid
+            over = (yes_bid > 0) & (no_bid > 0) & (value > 1.0) & (
+                (value - 1.0) * 100 >= self.min_profit
+            )
+
+        for i in np.flatnonzero(under | over):
+            state = states[i]
+            self._collect(state, under[i], over[i], candidates)
+
+        ask_totals = self._negrisk_totals(events, "yes_prices", "ask_total")
+        bid_totals = self._negrisk_totals(events, "yes_bids", "bid_total")
+
+        # Screen with a small tolerance; the exact checks below decide
+        eps = 1e-9
+        with np.errstate(invalid="ignore", divide="ignore"):
+            under = (ask_totals < 1.0) & (ask_totals > 0.1) & (
+                (1.0 - ask_totals) / ask_totals * 100 >= self.min_profit - eps
+            )
+            over = (bid_totals > 1.0) & ((bid_totals - 1.0) * 100 >= self.min_profit - eps)
+
+        for i in np.flatnonzero(under | over):
+            state = events[i]
+            self._collect(state, under[i], over[i], candidates)
+
+        return candidates
+
+    @staticmethod
+    def _negrisk_totals(
+        events: List["NegRiskEventState"], prices_attr: str, total_attr: str
+    ) -> np.ndarray:
+        """
+        Per-event running total, NaN for events with fewer than 3 prices
+        (too few outcomes to check).
+        """
+        return np.fromiter(
+            (
+                getattr(e, total_attr) if len(getattr(e, prices_attr)) >= 3 else np.nan
+                for e in events
+            ),
+            np.float64,
+            len(events),
+        )
+
     def clear_seen(self):
         """Clear seen opportunities (for periodic refresh)"""
         self.seen_opportunities.clear()
@@ -16,12 +16,41 @@ except ImportError:
 @dataclass
 class APIConfig:
     """API endpoints configuration"""
-    gamma_api: str = "https://gamma-api.polymarket.com"
-    clob_api: str = "https://clob.polymarket.com"
-    ws_clob: str = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+    # Endpoints can be overridden (e.g. to point staging at mocks)
+    gamma_api: str = field(
+        default_factory=lambda: os.getenv(
+            "POLYMARKET_GAMMA_API", "https://gamma-api.polymarket.com"
+        )
+    )
+    clob_api: str = field(
+        default_factory=lambda: os.getenv("POLYMARKET_CLOB_API", "https://clob.polymarket.com")
+    )
+    ws_clob: str = field(
+        default_factory=lambda: os.getenv(
+            "POLYMARKET_WS_CLOB", "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+        )
+    )
     ws_user: str = "wss://ws-subscriptions-clob.polymarket.com/ws/user"
     timeout: int = 30
     max_concurrent: int = 50  # Max concurrent API requests
+    rate_limit: float = 300  # Max CLOB requests per second (0 = unlimited)
+    max_retries: int = 3  # Retries for 429/5xx/connection errors (0 = none)
+    retry_backoff: float = 0.1  # First retry delay in seconds, doubled each attempt
+    retry_backoff_max: float = 2.0  # Cap on a single backoff delay
+    prices_batch_size: int = 500  # Tokens per POST /prices request
+    price_cache_ttl: float = 3.0  # Seconds a fetched price is reused (0 = off)
+    pool_size: int = 100  # Max pooled connections per client session
+    pool_size_per_host: int = 64  # Max pooled connections to a single host
+    keepalive_timeout: float = 75  # Seconds an idle connection stays open
+    dns_cache_ttl: int = 300  # Seconds resolved addresses are reused
+    force_ipv4: bool = field(  # Skip IPv6 attempts on hosts without v6 routes
+        default_factory=lambda: os.getenv("POLYMARKET_FORCE_IPV4", "").lower() in ("1", "true")
+    )
+    markets_cache_ttl: float = 300  # Seconds parsed market lists are reused (0 = off)
+    ws_idle_ping: float = 10.0  # Seconds without a frame before sending a PING
+    ws_max_silence: float = 45.0  # Seconds without a frame before reconnecting
+    ws_max_size: int = 1 << 20  # Largest accepted WebSocket message (bytes)
+    ws_max_queue: int = 1024  # Frames buffered before reads pause (feeds batch drains)
 
 
 @dataclass
@@ -33,6 +62,7 @@ class ArbitrageConfig:
 
     # Scan settings
     max_markets: int = 500  # Markets to scan
+    max_seen_opportunities: int = 10_000  # Dedup history size (oldest evicted)
     scan_interval: int = 10  # Seconds between scans
 
     # Order book depth
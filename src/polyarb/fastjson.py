@@ -0,0 +1,45 @@
+"""
+JSON helpers - orjson when installed, stdlib json otherwise
+
+Install with: pip install polymarket-arbitrage[speedups]
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+# Raised by loads() on malformed input (orjson's error subclasses this too)
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def dumps_indented_bytes(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes indented by two spaces (for files)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to a compact JSON string"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
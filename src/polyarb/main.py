@@ -17,16 +17,27 @@ Usage:
 """
 import argparse
 import asyncio
-import json
 import sys
 from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional
 
+# libuv-based event loop (speedups extra; not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+from . import fastjson
 from .config import config
 from .scanner import ArbitrageScanner
+from .api.websocket import start_log_listener
 from .paper_trading import PaperTradingEngine, TradingMode, PRESETS, get_mode_comparison, SummaryChart
 
 
-def parse_args():
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser once; later calls reuse it"""
     parser = argparse.ArgumentParser(
         description="Polymarket Arbitrage Scanner v3.2 (WebSocket)",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -132,13 +143,19 @@ Paper-based recommendations:
         help="Enable debug output",
     )
 
-    return parser.parse_args()
+    return parser
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments (sys.argv[1:] when argv is None)"""
+    return _build_parser().parse_args(argv)
 
 
 async def run_paper_trading(args):
     """Run paper trading mode"""
     from .api.gamma import GammaClient
     from .api.clob import CLOBClient
+    from .api.http import create_session
     from .api.websocket import RealtimeArbitrageDetector
     from .models import MarketType
 
@@ -206,12 +223,18 @@ async def run_paper_trading(args):
 
     # Fetch markets and register
     print("Fetching markets...")
-    async with GammaClient() as gamma, CLOBClient() as clob:
-        markets = await gamma.get_all_markets(limit=500)
-        binary_markets = [m for m in markets if m.market_type == MarketType.BINARY]
-        events = await gamma.get_negrisk_events(limit=100)
+    async with create_session() as session:
+        gamma = GammaClient(session=session)
+        clob = CLOBClient(session=session)
+        markets, events = await asyncio.gather(
+            gamma.get_markets_partitioned(limit=500),
+            gamma.get_negrisk_events(limit=100),
+        )
+        binary_markets = markets[MarketType.BINARY]
 
         print(f"  Binary markets: {len(binary_markets)}")
+        # Only price markets the detector will accept
+        binary_markets = [m for m in binary_markets if m.liquidity >= min_liquidity]
         print(f"  NegRisk events: {len(events)}")
 
         # Get prices for binary markets
@@ -221,8 +244,8 @@ async def run_paper_trading(args):
                 all_token_ids.extend([market.tokens[0].token_id, market.tokens[1].token_id])
 
         print(f"  Fetching prices for {len(all_token_ids)} tokens...")
-        all_asks = await clob.get_prices_batch(all_token_ids, side='buy')
-        all_bids = await clob.get_prices_batch(all_token_ids, side='sell')
+        # Both sides in the same batched requests
+        all_asks, all_bids = await clob.get_quotes_batch(all_token_ids)
 
         # Register binary markets
         for market in binary_markets[:200]:
@@ -252,26 +275,19 @@ async def run_paper_trading(args):
         # Note: A market can be both underpriced (ask) and overpriced (bid) due to spread.
         # We pick the better opportunity (higher profit %).
         print("Scanning for initial opportunities...")
-        initial_count = 0
-        for state in detector.binary_markets.values():
-            under = state.check_underpriced(min_profit)
-            over = state.check_overpriced(min_profit)
-
-            # Pick the better one if both exist
-            if under and over:
-                if under["profit_percent"] >= over["profit_percent"]:
-                    engine.execute_opportunity(under)
-                else:
-                    engine.execute_opportunity(over)
-                initial_count += 1
-            elif under:
-                engine.execute_opportunity(under)
-                initial_count += 1
-            elif over:
-                engine.execute_opportunity(over)
-                initial_count += 1
-
-        print(f"  Found {initial_count} initial opportunities")
+        # scan_all screens every market in one vectorized pass and lists a
+        # market's underpriced hit before its overpriced one, so strict ">"
+        # keeps underpriced on a tie
+        best = {}
+        for opp in detector.scan_all():
+            key = opp.get("market_id", opp.get("event_id"))
+            if key not in best or opp["profit_percent"] > best[key]["profit_percent"]:
+                best[key] = opp
+
+        for opp in best.values():
+            engine.execute_opportunity(opp)
+
+        print(f"  Found {len(best)} initial opportunities")
         engine.print_status()
 
         # If duration specified, run for that time
@@ -299,13 +315,13 @@ async def run_paper_trading(args):
     # JSON
     summary = engine.get_summary()
     json_file = f"paper_trading_{timestamp}.json"
-    with open(json_file, 'w') as f:
-        json.dump(summary, f, indent=2)
+    with open(json_file, 'wb') as f:
+        f.write(fastjson.dumps_indented_bytes(summary))
 
-    # PNG chart
+    # PNG chart (matplotlib rendering is slow, keep it off the event loop)
     png_file = f"paper_trading_{timestamp}.png"
     chart = SummaryChart(engine)
-    chart.save(png_file)
+    await asyncio.to_thread(chart.save, png_file)
 
     print("\n  Results saved:")
     print(f"    {json_file}")
@@ -338,8 +354,10 @@ async def main_async():
 
 def main():
     """Entry point"""
+    start_log_listener()
+    run = uvloop.run if uvloop is not None else asyncio.run
     try:
-        asyncio.run(main_async())
+        run(main_async())
     except KeyboardInterrupt:
         print("\n\n  Session interrupted by user")
         print("  Goodbye!")
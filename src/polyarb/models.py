@@ -5,6 +5,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, List, Dict
 from enum import Enum
+from operator import attrgetter
 
 
 class MarketType(Enum):
@@ -22,7 +23,7 @@ class ArbitrageType(Enum):
     NEGRISK_OVERPRICED = "negrisk_overpriced"  # Sum of all YES > $1
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """Represents a market outcome token"""
     token_id: str
@@ -36,7 +37,7 @@ class Token:
     ask_depth: Dict[float, float] = field(default_factory=dict)  # price -> size
 
 
-@dataclass
+@dataclass(slots=True)
 class Market:
     """Represents a Polymarket market"""
     market_id: str
@@ -67,7 +68,7 @@ class Market:
         return len(self.tokens) > 2
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OrderBookLevel:
     """Single level in order book"""
     price: float
@@ -78,7 +79,7 @@ class OrderBookLevel:
         return self.price * self.size
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderBook:
     """Order book for a token"""
     token_id: str
@@ -131,9 +132,9 @@ class OrderBook:
         return None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ArbitrageOpportunity:
-    """Represents an arbitrage opportunity"""
+    """Represents an arbitrage opportunity (immutable once detected)"""
     # Market info
     market_id: str
     condition_id: str
@@ -150,8 +151,8 @@ class ArbitrageOpportunity:
     profit: float  # Guaranteed profit ($1 - total_cost)
     profit_percent: float
 
-    # Token details
-    tokens: List[Token]
+    # Token details (excluded from eq/hash so instances stay hashable)
+    tokens: List[Token] = field(compare=False)
 
     # Market stats
     liquidity: float
@@ -209,4 +210,4 @@ class ScanResult:
     def best_opportunity(self) -> Optional[ArbitrageOpportunity]:
         if not self.opportunities:
             return None
-        return max(self.opportunities, key=lambda x: x.profit_percent)
+        return max(self.opportunities, key=attrgetter("profit_percent"))
@@ -1,5 +1,6 @@
 """Paper Trading Engine - PoC for arbitrage strategy validation"""
 import random
+import sys
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Callable
@@ -57,6 +58,9 @@ class PaperTradingEngine:
             self.failure_rate = failure_rate
             self.liquidity_cap_pct = liquidity_cap_pct
 
+        # Private generator for failure simulation (seedable per engine)
+        self._rng = random.Random()
+
         # State
         self.positions: Dict[str, Position] = {}
         self.trades: List[Trade] = []
@@ -88,7 +92,7 @@ class PaperTradingEngine:
         self.opportunities_seen += 1
 
         # Simulate execution failure (realistic mode)
-        if self.failure_rate > 0 and random.random() < self.failure_rate:
+        if self.failure_rate > 0 and self._rng.random() < self.failure_rate:
             self.opportunities_failed += 1
             self.opportunities_skipped += 1
             if self.on_failure:
@@ -270,8 +274,13 @@ class PaperTradingEngine:
         minutes = int((runtime % 3600) // 60)
         seconds = int(runtime % 60)
 
-        open_positions = [p for p in self.positions.values() if p.status == PositionStatus.OPEN]
-        closed_positions = [p for p in self.positions.values() if p.status == PositionStatus.CLOSED]
+        open_positions = 0
+        closed_positions = 0
+        for p in self.positions.values():
+            if p.status == PositionStatus.OPEN:
+                open_positions += 1
+            elif p.status == PositionStatus.CLOSED:
+                closed_positions += 1
 
         # Mode name
         mode_name = self.mode.value if self.mode else "custom"
@@ -282,8 +291,8 @@ class PaperTradingEngine:
             "runtime_seconds": runtime,
             "initial_balance": self.initial_balance,
             "balance": self.balance,
-            "open_positions": len(open_positions),
-            "closed_positions": len(closed_positions),
+            "open_positions": open_positions,
+            "closed_positions": closed_positions,
             "realized_pnl": self.realized_pnl,
             "unrealized_pnl": self.unrealized_pnl,
             "total_pnl": self.total_pnl,
@@ -305,27 +314,33 @@ class PaperTradingEngine:
         """Print formatted status"""
         s = self.get_status()
 
-        print()
-        print("=" * 64)
+        rule = "=" * 64
+        thin = "-" * 64
         mode_str = f" [{s['mode'].upper()}]" if s['mode'] != 'custom' else ""
-        print(f"  PAPER TRADING STATUS{mode_str}")
-        print("=" * 64)
-        print(f"  Runtime: {s['runtime']}")
-        print(f"  Balance: ${s['balance']:,.2f}  (Initial: ${s['initial_balance']:,.2f})")
-        print(f"  Positions: {s['open_positions']} open, {s['closed_positions']} closed")
-        print("-" * 64)
-        print(f"  Realized P&L:   ${s['realized_pnl']:+,.2f}")
-        print(f"  Unrealized P&L: ${s['unrealized_pnl']:+,.2f}")
-        print(f"  Total P&L:      ${s['total_pnl']:+,.2f} ({s['return_percent']:+.2f}%)")
-        print("-" * 64)
-        print(f"  Win Rate: {s['win_rate']*100:.1f}%  |  Max Drawdown: {s['max_drawdown']:.1f}%")
-        print(f"  Execution Rate: {s['execution_rate']:.1f}%")
-        print(f"  Opportunities: {s['opportunities_executed']}/{s['opportunities_seen']} executed, {s['opportunities_failed']} failed")
+        lines = [
+            "",
+            rule,
+            f"  PAPER TRADING STATUS{mode_str}",
+            rule,
+            f"  Runtime: {s['runtime']}",
+            f"  Balance: ${s['balance']:,.2f}  (Initial: ${s['initial_balance']:,.2f})",
+            f"  Positions: {s['open_positions']} open, {s['closed_positions']} closed",
+            thin,
+            f"  Realized P&L:   ${s['realized_pnl']:+,.2f}",
+            f"  Unrealized P&L: ${s['unrealized_pnl']:+,.2f}",
+            f"  Total P&L:      ${s['total_pnl']:+,.2f} ({s['return_percent']:+.2f}%)",
+            thin,
+            f"  Win Rate: {s['win_rate']*100:.1f}%  |  Max Drawdown: {s['max_drawdown']:.1f}%",
+            f"  Execution Rate: {s['execution_rate']:.1f}%",
+            f"  Opportunities: {s['opportunities_executed']}/{s['opportunities_seen']} executed, {s['opportunities_failed']} failed",
+        ]
         if s['latency_ms'] > 0 or s['failure_rate'] > 0:
-            print("-" * 64)
-            print(f"  Simulation: latency={s['latency_ms']}ms, failure={s['failure_rate']*100:.0f}%")
-        print("=" * 64)
-        print()
+            lines.append(thin)
+            lines.append(f"  Simulation: latency={s['latency_ms']}ms, failure={s['failure_rate']*100:.0f}%")
+        lines.append(rule)
+        lines.append("")
+        lines.append("")
+        sys.stdout.write("\n".join(lines))
 
     def print_recent_trades(self, n: int = 5):
         """Print recent trades"""
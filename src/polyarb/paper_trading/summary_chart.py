@@ -2,7 +2,8 @@
 Summary Chart Generator - PNG output for paper trading results.
 
 Simple matplotlib-based chart generation.
-No external UI dependencies.
+No external UI dependencies. Figures are built without pyplot, so save()
+is safe to run in a worker thread.
 """
 from typing import Dict, Any, TYPE_CHECKING
 
@@ -37,10 +38,10 @@ class SummaryChart:
             Saved file path
         """
         # Import matplotlib only when needed
-        import matplotlib.pyplot as plt
-        import matplotlib.patches as mpatches
+        from matplotlib.figure import Figure
 
-        fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+        fig = Figure(figsize=(12, 8))
+        axes = fig.subplots(2, 2)
         fig.suptitle(self._get_title(), fontsize=14, fontweight='bold')
 
         # 1. Key Metrics (top-left)
@@ -55,9 +56,8 @@ class SummaryChart:
         # 4. Settings Info (bottom-right)
         self._draw_settings(axes[1, 1])
 
-        plt.tight_layout()
-        plt.savefig(filepath, dpi=150, bbox_inches='tight')
-        plt.close(fig)
+        fig.tight_layout()
+        fig.savefig(filepath, dpi=150, bbox_inches='tight')
 
         return filepath
 
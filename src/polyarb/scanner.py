@@ -4,18 +4,41 @@ Real-time WebSocket-based arbitrage detection
 """
 import asyncio
 import csv
+import io
+import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Set, Optional
+from typing import Iterable, List, Set, Optional
 
 from .config import config
-from .models import ArbitrageOpportunity, MarketType
+from .models import ArbitrageOpportunity, Market, MarketType
 from .api.gamma import GammaClient
 from .api.clob import CLOBClient
-from .api.websocket import WebSocketClient, RealtimeArbitrageDetector
+from .api.http import create_session
+from .api.websocket import WebSocketClient, RealtimeArbitrageDetector, start_log_listener
 from .alerts import AlertManager
 
+# Rows buffered for the CSV writer task before new ones are dropped
+LOG_QUEUE_SIZE = 10_000
+# Rows formatted and written per file write
+LOG_BATCH_SIZE = 64
+
+# Last formatted wall-clock second, reused by _clock_ms
+_clock_second: Optional[int] = None
+_clock_text = ""
+
+
+def _clock_ms() -> str:
+    """Local time as HH:MM:SS.mmm, running strftime at most once per second"""
+    global _clock_second, _clock_text
+    now = time.time()
+    second = int(now)
+    if second != _clock_second:
+        _clock_second = second
+        _clock_text = time.strftime("%H:%M:%S", time.localtime(second))
+    return f"{_clock_text}.{int((now - second) * 1000):03d}"
+
 
 class ArbitrageScanner:
     """
@@ -44,8 +67,11 @@ class ArbitrageScanner:
         self.seen_opportunities: Set[str] = set()
         self.opportunities_found = 0
 
-        # Log file
+        # Log file (written by a single task while run() is active)
         self.log_file = Path(config.log_file)
+        self._log_queue: Optional[asyncio.Queue] = None
+        self._log_task: Optional[asyncio.Task] = None
+        self.log_rows_dropped = 0
         if enable_logging and not self.log_file.exists():
             self._init_log_file()
 
@@ -59,27 +85,132 @@ class ArbitrageScanner:
                 "category", "max_size", "url"
             ])
 
+    @staticmethod
+    def _opportunity_row(opp: ArbitrageOpportunity) -> tuple:
+        """CSV row for a scored opportunity"""
+        return (
+            opp.timestamp.isoformat(),
+            opp.market_id,
+            opp.question[:100],
+            opp.arb_type.value,
+            opp.market_type.value,
+            opp.total_cost,
+            opp.profit,
+            opp.profit_percent,
+            opp.liquidity,
+            opp.category,
+            opp.max_executable_size,
+            opp.url,
+        )
+
+    @staticmethod
+    def _ws_opportunity_row(opp: dict) -> tuple:
+        """CSV row for a detector (WebSocket) opportunity"""
+        opp_type = opp.get("type", "")
+        market_type = MarketType.NEGRISK if "NEGRISK" in opp_type else MarketType.BINARY
+        return (
+            datetime.now().isoformat(),
+            opp.get("market_id", opp.get("event_id", "")),
+            (opp.get("question") or opp.get("title", ""))[:100],
+            opp_type.lower(),
+            market_type.value,
+            opp.get("total_cost", opp.get("total_value")),
+            opp.get("profit"),
+            opp.get("profit_percent"),
+            opp.get("liquidity"),
+            opp.get("category", ""),
+            "",
+            opp.get("url", ""),
+        )
+
+    @staticmethod
+    def _price_token_ids(binary_markets: List[Market], negrisk_events: List[dict]) -> List[str]:
+        """
+        Tokens to price over REST before streaming: both tokens of every
+        binary market and the YES token of each NegRisk member market,
+        deduplicated (a market can appear in both listings).
+
+        Every market is priced: Gamma's outcomePrices are mid/last prices
+        that sum to about $1 by construction, so they cannot rule out an
+        executable mispricing.
+        """
+        token_ids = [t.token_id for m in binary_markets for t in m.tokens]
+        token_ids.extend(
+            m.tokens[0].token_id
+            for event in negrisk_events
+            for m in event.get("markets", [])
+            if len(m.tokens) >= 2
+        )
+        return list(dict.fromkeys(token_ids))
+
     def _log_opportunity(self, opp: ArbitrageOpportunity):
-        """Log opportunity to CSV"""
+        """Log opportunity to CSV (queued to the writer task when running)"""
+        self._log_row(self._opportunity_row(opp))
+
+    def _log_row(self, row: tuple):
+        """Queue a row for the writer task, or write it directly"""
         if not self.enable_logging:
             return
+        if self._log_queue is not None:
+            try:
+                self._log_queue.put_nowait(row)
+            except asyncio.QueueFull:
+                # Never stall detection on disk; count what was lost
+                self.log_rows_dropped += 1
+        else:
+            self._write_rows([row])
 
-        with open(self.log_file, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                opp.timestamp.isoformat(),
-                opp.market_id,
-                opp.question[:100],
-                opp.arb_type.value,
-                opp.market_type.value,
-                opp.total_cost,
-                opp.profit,
-                opp.profit_percent,
-                opp.liquidity,
-                opp.category,
-                opp.max_executable_size,
-                opp.url,
-            ])
+    def _write_rows(self, rows: Iterable[tuple]):
+        with open(self.log_file, "a", newline="", encoding="utf-8", buffering=1 << 20) as f:
+            csv.writer(f).writerows(rows)
+
+    def _start_log_writer(self):
+        """Start the single writer task that owns the CSV file"""
+        if self.enable_logging and self._log_task is None:
+            self._log_queue = asyncio.Queue(maxsize=LOG_QUEUE_SIZE)
+            self._log_task = asyncio.create_task(self._log_writer(self._log_queue))
+
+    async def _stop_log_writer(self):
+        """Flush queued rows and close the CSV file"""
+        if self._log_task is None:
+            return
+        # Wait for room rather than drop the sentinel on a full queue
+        await self._log_queue.put(None)
+        await self._log_task
+        self._log_task = None
+        self._log_queue = None
+
+    async def _log_writer(self, queue: asyncio.Queue):
+        """
+        Drain queued rows into one long-lived file handle.
+        Rows are formatted in batches of up to LOG_BATCH_SIZE and each
+        batch is written and flushed in a worker thread, so disk latency
+        never blocks the event loop.
+        """
+        buffer = io.StringIO(newline="")
+        writer = csv.writer(buffer)
+        with open(self.log_file, "a", newline="", encoding="utf-8", buffering=1 << 16) as f:
+            done = False
+            while not done:
+                rows = [await queue.get()]
+                while len(rows) < LOG_BATCH_SIZE and not queue.empty():
+                    rows.append(queue.get_nowait())
+                # The None sentinel is always the last row ever queued
+                if rows[-1] is None:
+                    rows.pop()
+                    done = True
+
+                writer.writerows(rows)
+                chunk = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                if chunk:
+                    await asyncio.to_thread(self._write_chunk, f, chunk)
+
+    @staticmethod
+    def _write_chunk(f, chunk: str):
+        f.write(chunk)
+        f.flush()
 
     async def run(self):
         """
@@ -91,7 +222,15 @@ class ArbitrageScanner:
         """
         self._print_banner()
         print("⚡ Real-time WebSocket arbitrage detection\n")
+        start_log_listener()
+        self._start_log_writer()
+        try:
+            await self._run_detection()
+        finally:
+            await self._stop_log_writer()
 
+    async def _run_detection(self):
+        """Discover markets, seed prices, then stream and detect"""
         # Create detector
         detector = RealtimeArbitrageDetector(
             min_profit_percent=self.min_profit,
@@ -101,49 +240,48 @@ class ArbitrageScanner:
         # Set up opportunity callback
         def on_opportunity(opp):
             self._display_ws_opportunity(opp)
+            self._log_row(self._ws_opportunity_row(opp))
 
         detector.on_opportunity = on_opportunity
 
         # Fetch markets and register with detector
         print("📊 Fetching markets...")
-        async with GammaClient() as gamma, CLOBClient() as clob:
-            # Get binary markets
-            markets = await gamma.get_all_markets(limit=config.arbitrage.max_markets)
-            binary_markets = [m for m in markets if m.market_type == MarketType.BINARY]
-
-            # Get NegRisk events
-            negrisk_events = await gamma.get_negrisk_events(limit=100)
+        # One pooled session for both REST clients
+        async with create_session() as session:
+            gamma = GammaClient(session=session)
+            clob = CLOBClient(session=session)
+            # Get binary markets and NegRisk events (independent, so concurrently)
+            markets, negrisk_events = await asyncio.gather(
+                gamma.get_markets_partitioned(limit=config.arbitrage.max_markets),
+                gamma.get_negrisk_events(limit=100),
+            )
+            binary_markets = markets[MarketType.BINARY]
 
             print(f"   Found {len(binary_markets)} binary markets")
             print(f"   Found {len(negrisk_events)} NegRisk events")
 
             # Collect all token IDs for batch price fetching
             print("\n⏳ Fetching initial prices (parallel)...")
-            all_token_ids = []
-            token_to_market_info = {}  # token_id -> (market, is_yes)
-
-            for market in binary_markets:
-                if len(market.tokens) != 2:
-                    continue
-                yes_token = market.tokens[0]
-                no_token = market.tokens[1]
-                all_token_ids.extend([yes_token.token_id, no_token.token_id])
-                token_to_market_info[yes_token.token_id] = (market, True)
-                token_to_market_info[no_token.token_id] = (market, False)
-
-            # Batch fetch all prices at once
-            all_asks = await clob.get_prices_batch(all_token_ids, side="buy")
-            all_bids = await clob.get_prices_batch(all_token_ids, side="sell")
+            # Gamma builds binary tokens in [YES, NO] order. Markets and
+            # events under the liquidity floor would be rejected at
+            # registration, so don't spend price requests on them
+            binary_markets = [
+                m for m in binary_markets
+                if len(m.tokens) == 2 and m.liquidity >= self.min_liquidity
+            ]
+            negrisk_events = [
+                e for e in negrisk_events
+                if e.get("total_liquidity", 0) >= self.min_liquidity
+            ]
+
+            # One batch for everything: binary and NegRisk tokens, asks and bids
+            fetch_ids = self._price_token_ids(binary_markets, negrisk_events)
+            all_asks, all_bids = await clob.get_quotes_batch(fetch_ids)
 
             # Register binary markets with fetched prices
-            registered_markets = set()
-            for token_id, (market, is_yes) in token_to_market_info.items():
-                if market.market_id in registered_markets:
-                    continue
-                registered_markets.add(market.market_id)
-
-                yes_token = market.tokens[0]
-                no_token = market.tokens[1]
+            for market in binary_markets:
+                yes_id = market.tokens[0].token_id
+                no_id = market.tokens[1].token_id
 
                 detector.register_binary_market(
                     market_id=market.market_id,
@@ -151,28 +289,14 @@ class ArbitrageScanner:
                     slug=market.slug,
                     liquidity=market.liquidity,
                     category=market.category,
-                    yes_token_id=yes_token.token_id,
-                    no_token_id=no_token.token_id,
-                    yes_ask=all_asks.get(yes_token.token_id),
-                    no_ask=all_asks.get(no_token.token_id),
-                    yes_bid=all_bids.get(yes_token.token_id),
-                    no_bid=all_bids.get(no_token.token_id),
+                    yes_token_id=yes_id,
+                    no_token_id=no_id,
+                    yes_ask=all_asks.get(yes_id),
+                    no_ask=all_asks.get(no_id),
+                    yes_bid=all_bids.get(yes_id),
+                    no_bid=all_bids.get(no_id),
                 )
 
-            # Collect NegRisk token IDs
-            negrisk_token_ids = []
-            for event in negrisk_events:
-                for m in event.get("markets", []):
-                    if len(m.tokens) >= 2:
-                        negrisk_token_ids.append(m.tokens[0].token_id)
-
-            # Batch fetch NegRisk prices
-            if negrisk_token_ids:
-                nr_asks = await clob.get_prices_batch(negrisk_token_ids, side="buy")
-                nr_bids = await clob.get_prices_batch(negrisk_token_ids, side="sell")
-            else:
-                nr_asks, nr_bids = {}, {}
-
             # Register NegRisk events
             for event in negrisk_events:
                 event_markets = []
@@ -183,8 +307,8 @@ class ArbitrageScanner:
                             "market_id": m.market_id,
                             "yes_token_id": yes_token.token_id,
                             "question": m.question,
-                            "yes_ask": nr_asks.get(yes_token.token_id),
-                            "yes_bid": nr_bids.get(yes_token.token_id),
+                            "yes_ask": all_asks.get(yes_token.token_id),
+                            "yes_bid": all_bids.get(yes_token.token_id),
                         })
 
                 detector.register_negrisk_event(
@@ -206,26 +330,10 @@ class ArbitrageScanner:
 
         # Initial scan for opportunities with current prices
         print("\n🔍 Checking for initial opportunities...")
-        initial_opps = 0
-        for state in detector.binary_markets.values():
-            opp = state.check_underpriced(self.min_profit)
-            if opp:
-                self._display_ws_opportunity(opp)
-                initial_opps += 1
-            opp = state.check_overpriced(self.min_profit)
-            if opp:
-                self._display_ws_opportunity(opp)
-                initial_opps += 1
-
-        for state in detector.negrisk_events.values():
-            opp = state.check_underpriced(self.min_profit)
-            if opp:
-                self._display_ws_opportunity(opp)
-                initial_opps += 1
-            opp = state.check_overpriced(self.min_profit)
-            if opp:
-                self._display_ws_opportunity(opp)
-                initial_opps += 1
+        initial = detector.scan_all()
+        for opp in initial:
+            on_opportunity(opp)
+        initial_opps = len(initial)
 
         if initial_opps == 0:
             print("   No initial opportunities found")
@@ -249,10 +357,13 @@ class ArbitrageScanner:
                     else:
                         await ws.add_subscription(batch)
 
-                async for message in ws.listen():
-                    # Process message and detect opportunities
-                    opportunities = detector.process_message(message)
-                    message_count += 1
+                async for batch in ws.listen_batch():
+                    # Apply the whole burst, then check each touched market
+                    # once (opportunities go to detector.on_opportunity)
+                    for message in batch:
+                        detector.apply_message(message)
+                    detector.scan_dirty()
+                    message_count += len(batch)
 
                     # Print stats periodically
                     current_time = time.perf_counter()
@@ -286,47 +397,56 @@ class ArbitrageScanner:
         else:
             action = "BUY"
 
-        print("\n" + "=" * 70)
-        print(f"{emoji} {opp_type} [{action}] - {profit_pct:.2f}% profit")
-        print("=" * 70)
+        rule = "=" * 70
+        thin = "-" * 70
+        lines = [
+            "",
+            rule,
+            f"{emoji} {opp_type} [{action}] - {profit_pct:.2f}% profit",
+            rule,
+        ]
 
         # Market/Event info
         if "question" in opp:
-            print(f"📌 {opp['question'][:60]}...")
+            lines.append(f"📌 {opp['question'][:60]}...")
         elif "title" in opp:
-            print(f"📌 {opp['title'][:60]}...")
+            lines.append(f"📌 {opp['title'][:60]}...")
 
         if "url" in opp:
-            print(f"🔗 {opp['url']}")
+            lines.append(f"🔗 {opp['url']}")
 
         # Prices
-        print("-" * 70)
+        lines.append(thin)
         if "yes_ask" in opp and "no_ask" in opp:
-            print(f"   YES ask: ${opp['yes_ask']:.4f}")
-            print(f"   NO ask:  ${opp['no_ask']:.4f}")
-            print(f"   Total:   ${opp.get('total_cost', 0):.4f}")
+            lines.append(f"   YES ask: ${opp['yes_ask']:.4f}")
+            lines.append(f"   NO ask:  ${opp['no_ask']:.4f}")
+            lines.append(f"   Total:   ${opp.get('total_cost', 0):.4f}")
         elif "yes_bid" in opp and "no_bid" in opp:
-            print(f"   YES bid: ${opp['yes_bid']:.4f}")
-            print(f"   NO bid:  ${opp['no_bid']:.4f}")
-            print(f"   Total:   ${opp.get('total_value', 0):.4f}")
+            lines.append(f"   YES bid: ${opp['yes_bid']:.4f}")
+            lines.append(f"   NO bid:  ${opp['no_bid']:.4f}")
+            lines.append(f"   Total:   ${opp.get('total_value', 0):.4f}")
         elif "prices" in opp:
             for token_id, price in list(opp["prices"].items())[:5]:
-                print(f"   {token_id[:20]}... ${price:.4f}")
+                lines.append(f"   {token_id[:20]}... ${price:.4f}")
             if len(opp["prices"]) > 5:
-                print(f"   ... and {len(opp['prices']) - 5} more")
+                lines.append(f"   ... and {len(opp['prices']) - 5} more")
             total = opp.get("total_cost", opp.get("total_value", 0))
-            print(f"   Total: ${total:.4f}")
+            lines.append(f"   Total: ${total:.4f}")
 
-        print("-" * 70)
-        print(f"💰 Profit: ${opp.get('profit', 0):.4f} ({profit_pct:.2f}%)")
-        print(f"💧 Liquidity: ${liquidity:,.0f}")
+        lines.append(thin)
+        lines.append(f"💰 Profit: ${opp.get('profit', 0):.4f} ({profit_pct:.2f}%)")
+        lines.append(f"💧 Liquidity: ${liquidity:,.0f}")
 
         # Investment projection
         safe_invest = min(liquidity * 0.05, 5000)
         projected_profit = safe_invest * (profit_pct / 100)
-        print(f"💡 ${safe_invest:,.0f} → ${projected_profit:.2f} profit")
-        print("=" * 70)
-        print(f"⏰ Detected at: {datetime.now().strftime('%H:%M:%S.%f')[:-3]}")
+        lines.append(f"💡 ${safe_invest:,.0f} → ${projected_profit:.2f} profit")
+        lines.append(rule)
+        lines.append(f"⏰ Detected at: {_clock_ms()}")
+
+        # One write per opportunity instead of one print per line
+        lines.append("")
+        sys.stdout.write("\n".join(lines))
 
     def _print_banner(self):
         """Print startup banner"""
@@ -0,0 +1,60 @@
+"""
+Fake HTTP objects (aiohttp-shaped session/response) for API client tests.
+"""
+import json
+
+
+class FakeResponse:
+    def __init__(self, status: int, payload=None, headers=None):
+        self.status = status
+        self._payload = payload
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(self.status)
+
+    async def json(self, **kwargs):
+        return self._payload
+
+    async def read(self) -> bytes:
+        return json.dumps(self._payload).encode()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeSession:
+    """
+    Records requests and answers from canned handlers, or replays
+    "responses" in order for GETs.
+    """
+
+    def __init__(self, post_handler=None, get_handler=None, responses=None):
+        if responses is not None:
+            replay = list(responses)
+
+            def get_handler(url, params):
+                return replay.pop(0)
+
+        self.post_handler = post_handler
+        self.get_handler = get_handler
+        self.posts = []
+        self.gets = []
+        self.request_headers = []
+        self.closed = False
+
+    def post(self, url, json=None, **kwargs):
+        self.posts.append((url, json))
+        return self.post_handler(url, json)
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.gets.append((url, params))
+        self.request_headers.append(headers)
+        return self.get_handler(url, params)
+
+    async def close(self):
+        self.closed = True
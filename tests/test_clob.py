@@ -0,0 +1,303 @@
+"""
+Tests for CLOB API client.
+
+HTTP is replaced by a fake session; the client logic (batching,
+fallback, parsing) runs for real.
+"""
+import asyncio
+import time
+
+import sys
+sys.path.insert(0, "src")
+
+from polyarb.api.clob import CLOBClient
+from polyarb.api.http import RateLimiter
+from tests.fakes import FakeResponse, FakeSession
+
+
+def make_client(session: FakeSession) -> CLOBClient:
+    client = CLOBClient(base_url="https://clob.test")
+    client._session = session
+    client._retry_backoff = 0.001  # keep retry tests fast
+    return client
+
+
+class TestGetPricesBatch:
+    """Tests for batched price fetching"""
+
+    def test_single_post_for_all_tokens(self):
+        """All tokens are priced with one POST /prices, no per-token GETs"""
+        def post(url, payload):
+            return FakeResponse(200, {
+                item["token_id"]: {"BUY": "0.45"} for item in payload
+            })
+
+        session = FakeSession(post_handler=post)
+        client = make_client(session)
+
+        prices = asyncio.run(client.get_prices_batch(["a", "b", "c"], side="buy"))
+
+        assert prices == {"a": 0.45, "b": 0.45, "c": 0.45}
+        assert len(session.posts) == 1
+        assert session.posts[0][0] == "https://clob.test/prices"
+        assert session.posts[0][1][0] == {"token_id": "a", "side": "BUY"}
+        assert session.gets == []
+
+    def test_missing_token_in_response_is_none(self):
+        """Tokens absent from the batch response map to None"""
+        session = FakeSession(post_handler=lambda u, p: FakeResponse(200, {"a": {"SELL": "0.52"}}))
+        client = make_client(session)
+
+        prices = asyncio.run(client.get_prices_batch(["a", "b"], side="sell"))
+
+        assert prices == {"a": 0.52, "b": None}
+
+    def test_falls_back_to_individual_requests(self):
+        """If the batch endpoint fails, each token is fetched via GET /price"""
+        session = FakeSession(
+            post_handler=lambda u, p: FakeResponse(500, None),
+            get_handler=lambda u, params: FakeResponse(200, {"price": "0.30"}),
+        )
+        client = make_client(session)
+
+        prices = asyncio.run(client.get_prices_batch(["a", "b"], side="buy"))
+
+        assert prices == {"a": 0.30, "b": 0.30}
+        assert len(session.gets) == 2
+
+    def test_empty_token_list(self):
+        """No tokens = no requests"""
+        session = FakeSession()
+        client = make_client(session)
+
+        assert asyncio.run(client.get_prices_batch([])) == {}
+        assert session.posts == []
+
+    def test_recent_prices_served_from_cache(self):
+        """A second lookup within the TTL does not hit the API again"""
+        def post(url, payload):
+            return FakeResponse(200, {
+                item["token_id"]: {"BUY": "0.45"} for item in payload
+            })
+
+        session = FakeSession(post_handler=post)
+        client = make_client(session)
+
+        asyncio.run(client.get_prices_batch(["a", "b"], side="buy"))
+        prices = asyncio.run(client.get_prices_batch(["a", "b", "c"], side="buy"))
+
+        assert prices == {"a": 0.45, "b": 0.45, "c": 0.45}
+        assert len(session.posts) == 2
+        # Only the uncached token is requested the second time
+        assert session.posts[1][1] == [{"token_id": "c", "side": "BUY"}]
+
+    def test_cache_is_per_side(self):
+        """An ask does not answer a bid lookup"""
+        def post(url, payload):
+            side = payload[0]["side"]
+            price = "0.45" if side == "BUY" else "0.40"
+            return FakeResponse(200, {item["token_id"]: {side: price} for item in payload})
+
+        session = FakeSession(post_handler=post)
+        client = make_client(session)
+
+        asks = asyncio.run(client.get_prices_batch(["a"], side="buy"))
+        bids = asyncio.run(client.get_prices_batch(["a"], side="sell"))
+
+        assert asks == {"a": 0.45}
+        assert bids == {"a": 0.40}
+
+
+class TestRateLimiter:
+    """Tests for the token-bucket rate limiter"""
+
+    def test_burst_within_capacity_does_not_wait(self):
+        """Requests up to the bucket capacity go through immediately"""
+        limiter = RateLimiter(rate=100, capacity=10)
+
+        async def burst():
+            start = time.monotonic()
+            for _ in range(10):
+                await limiter.acquire()
+            return time.monotonic() - start
+
+        assert asyncio.run(burst()) < 0.05
+
+    def test_waits_when_bucket_is_empty(self):
+        """Once the bucket is drained, acquire waits for a refill"""
+        limiter = RateLimiter(rate=20, capacity=1)
+
+        async def two_requests():
+            start = time.monotonic()
+            await limiter.acquire()
+            await limiter.acquire()
+            return time.monotonic() - start
+
+        # Second token takes ~1/20 s to refill
+        assert asyncio.run(two_requests()) >= 0.04
+
+    def test_zero_rate_disables_limiting(self):
+        limiter = RateLimiter(rate=0)
+
+        async def many():
+            for _ in range(1000):
+                await limiter.acquire()
+
+        asyncio.run(many())
+
+
+class TestGetQuotesBatch:
+    """Tests for fetching asks and bids together"""
+
+    def test_both_sides_in_one_post(self):
+        def post(url, payload):
+            return FakeResponse(200, {
+                item["token_id"]: {"BUY": "0.45", "SELL": "0.44"} for item in payload
+            })
+
+        session = FakeSession(post_handler=post)
+        client = make_client(session)
+
+        asks, bids = asyncio.run(client.get_quotes_batch(["a", "b"]))
+
+        assert asks == {"a": 0.45, "b": 0.45}
+        assert bids == {"a": 0.44, "b": 0.44}
+        assert len(session.posts) == 1
+        assert session.posts[0][1] == [
+            {"token_id": "a", "side": "BUY"},
+            {"token_id": "a", "side": "SELL"},
+            {"token_id": "b", "side": "BUY"},
+            {"token_id": "b", "side": "SELL"},
+        ]
+
+
+class TestGetOrderBooksBatch:
+    """Tests for batched order book fetching"""
+
+    def test_single_post_for_all_books(self):
+        def post(url, payload):
+            return FakeResponse(200, [
+                {
+                    "asset_id": item["token_id"],
+                    "bids": [{"price": "0.44", "size": "100"}],
+                    "asks": [{"price": "0.46", "size": "50"}],
+                }
+                for item in payload
+            ])
+
+        session = FakeSession(post_handler=post)
+        client = make_client(session)
+
+        books = asyncio.run(client.get_order_books_batch(["a", "b"]))
+
+        assert session.posts[0][0] == "https://clob.test/books"
+        assert len(session.posts) == 1
+        assert books["a"].best_bid == 0.44
+        assert books["b"].best_ask == 0.46
+
+    def test_falls_back_to_individual_requests(self):
+        session = FakeSession(
+            post_handler=lambda u, p: FakeResponse(404, None),
+            get_handler=lambda u, params: FakeResponse(200, {
+                "bids": [], "asks": [{"price": "0.5", "size": "10"}],
+            }),
+        )
+        client = make_client(session)
+
+        books = asyncio.run(client.get_order_books_batch(["a", "b"]))
+
+        assert len(session.gets) == 2
+        assert books["a"].best_ask == 0.5
+        assert books["b"].token_id == "b"
+
+
+class TestParseOrderBook:
+    """Tests for order book level ordering"""
+
+    def _book(self, bids, asks):
+        client = CLOBClient(base_url="https://clob.test")
+        return client._parse_order_book("tok", {
+            "bids": [{"price": str(p), "size": "10"} for p in bids],
+            "asks": [{"price": str(p), "size": "10"} for p in asks],
+        })
+
+    def test_best_last_server_order(self):
+        """CLOB lists levels best-last; they come out best-first"""
+        book = self._book(bids=[0.40, 0.42, 0.44], asks=[0.60, 0.55, 0.50])
+
+        assert [lvl.price for lvl in book.bids] == [0.44, 0.42, 0.40]
+        assert [lvl.price for lvl in book.asks] == [0.50, 0.55, 0.60]
+
+    def test_already_best_first(self):
+        book = self._book(bids=[0.44, 0.42], asks=[0.50, 0.55])
+
+        assert book.best_bid == 0.44
+        assert book.best_ask == 0.50
+
+    def test_unordered_levels_are_sorted(self):
+        book = self._book(bids=[0.42, 0.44, 0.40], asks=[0.55, 0.50, 0.60])
+
+        assert [lvl.price for lvl in book.bids] == [0.44, 0.42, 0.40]
+        assert [lvl.price for lvl in book.asks] == [0.50, 0.55, 0.60]
+
+
+class TestRetries:
+    """Tests for retry with backoff on transient failures"""
+
+    def test_retries_transient_status(self):
+        """A 503 followed by success yields the price"""
+        responses = [FakeResponse(503, None), FakeResponse(200, {"price": "0.42"})]
+        session = FakeSession(get_handler=lambda u, p: responses.pop(0))
+        client = make_client(session)
+
+        assert asyncio.run(client.get_price("a")) == 0.42
+        assert len(session.gets) == 2
+
+    def test_gives_up_after_max_retries(self):
+        session = FakeSession(get_handler=lambda u, p: FakeResponse(503, None))
+        client = make_client(session)
+        client._max_retries = 2
+
+        assert asyncio.run(client.get_price("a")) is None
+        assert len(session.gets) == 3
+
+    def test_client_error_is_not_retried(self):
+        session = FakeSession(get_handler=lambda u, p: FakeResponse(404, None))
+        client = make_client(session)
+
+        assert asyncio.run(client.get_price("a")) is None
+        assert len(session.gets) == 1
+
+    def test_honours_retry_after(self, monkeypatch):
+        """429 waits for the server's Retry-After instead of the backoff"""
+        delays = []
+        real_sleep = asyncio.sleep
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+            await real_sleep(0)
+
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        responses = [
+            FakeResponse(429, None, {"Retry-After": "1.5"}),
+            FakeResponse(200, {"price": "0.42"}),
+        ]
+        session = FakeSession(get_handler=lambda u, p: responses.pop(0))
+        client = make_client(session)
+
+        assert asyncio.run(client.get_price("a")) == 0.42
+        assert delays == [1.5]
+
+
+class TestSharedSession:
+    """An injected session is used but not closed by the client"""
+
+    def test_injected_session_is_not_closed(self):
+        session = FakeSession()
+
+        async def use():
+            async with CLOBClient(session=session) as client:
+                assert client.session is session
+
+        asyncio.run(use())
+        assert session.closed is False
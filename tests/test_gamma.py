@@ -0,0 +1,228 @@
+"""
+Tests for Gamma API market parsing.
+
+parse_market is pure (no HTTP), so it is tested directly with
+raw payloads shaped like the Gamma /markets response.
+"""
+import asyncio
+
+import sys
+sys.path.insert(0, "src")
+
+from polyarb.api.gamma import GammaClient
+from polyarb.config import config
+from polyarb.models import MarketType
+from tests.fakes import FakeResponse, FakeSession
+
+
+def raw_market(**overrides) -> dict:
+    """Minimal Gamma market payload for a binary market"""
+    raw = {
+        "id": 123,
+        "conditionId": "0xcond",
+        "question": "Will it rain tomorrow?",
+        "slug": "will-it-rain",
+        "clobTokenIds": '["yes_tok", "no_tok"]',
+        "outcomes": '["Yes", "No"]',
+        "outcomePrices": '["0.45", "0.55"]',
+        "liquidityNum": 25000,
+        "volumeNum": 100000,
+        "enableOrderBook": True,
+        "active": True,
+        "closed": False,
+    }
+    raw.update(overrides)
+    return raw
+
+
+class TestParseMarket:
+    """Tests for GammaClient.parse_market"""
+
+    def test_binary_market(self):
+        """Two token IDs produce a YES/NO binary market"""
+        market = GammaClient().parse_market(raw_market())
+
+        assert market is not None
+        assert market.market_id == "123"
+        assert market.market_type == MarketType.BINARY
+        assert [t.token_id for t in market.tokens] == ["yes_tok", "no_tok"]
+        assert [t.outcome for t in market.tokens] == ["YES", "NO"]
+        assert market.liquidity == 25000.0
+
+    def test_multi_outcome_market(self):
+        """More than two token IDs produce a NegRisk market"""
+        market = GammaClient().parse_market(raw_market(
+            clobTokenIds='["a", "b", "c"]',
+            outcomes='["Alice", "Bob", "Carol"]',
+        ))
+
+        assert market.market_type == MarketType.NEGRISK
+        assert [t.outcome for t in market.tokens] == ["Alice", "Bob", "Carol"]
+        assert market.neg_risk is True
+
+    def test_skips_closed_market(self):
+        assert GammaClient().parse_market(raw_market(closed=True)) is None
+
+    def test_skips_inactive_market(self):
+        assert GammaClient().parse_market(raw_market(active=False)) is None
+
+    def test_skips_market_without_order_book(self):
+        assert GammaClient().parse_market(raw_market(enableOrderBook=False)) is None
+
+    def test_skips_market_without_tokens(self):
+        assert GammaClient().parse_market(raw_market(clobTokenIds="")) is None
+
+    def test_comma_separated_token_ids(self):
+        """Non-JSON token lists fall back to comma splitting"""
+        market = GammaClient().parse_market(raw_market(clobTokenIds="yes_tok, no_tok"))
+
+        assert [t.token_id for t in market.tokens] == ["yes_tok", "no_tok"]
+
+    def test_closed_market_skips_token_parse(self):
+        client = GammaClient()
+
+        assert client.parse_market(raw_market(closed=True)) is None
+        assert client._token_ids_cache == {}
+
+    def test_category_from_slug(self):
+        """Sports and politics keywords in the slug set the category"""
+        sports = GammaClient().parse_market(raw_market(slug="nba-finals-game-7"))
+        politics = GammaClient().parse_market(raw_market(slug="us-presidential-election"))
+
+        assert sports.category == "sports"
+        assert politics.category == "politics"
+
+    def test_category_keywords_ignore_case(self):
+        market = GammaClient().parse_market(raw_market(groupItemTitle="NFL Week 1"))
+
+        assert market.category == "sports"
+
+    def test_token_ids_parsed_once_per_raw_string(self):
+        """Repeated scans reuse the parsed clobTokenIds"""
+        client = GammaClient()
+        first = client.parse_market(raw_market())
+        second = client.parse_market(raw_market(id=456))
+
+        assert [t.token_id for t in second.tokens] == ["yes_tok", "no_tok"]
+        assert list(client._token_ids_cache) == ['["yes_tok", "no_tok"]']
+        assert first.tokens[0].token_id is second.tokens[0].token_id
+
+
+class TestConditionalFetch:
+    """Tests for ETag / Last-Modified revalidation"""
+
+    def test_not_modified_reuses_cached_body(self):
+        body = [raw_market()]
+        session = FakeSession(responses=[
+            FakeResponse(200, body, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024"}),
+            FakeResponse(304),
+        ])
+        client = GammaClient(base_url="https://gamma.test")
+        client._session = session
+
+        first = asyncio.run(client.fetch_markets(limit=10))
+        second = asyncio.run(client.fetch_markets(limit=10))
+
+        assert first == second == body
+        assert session.request_headers[0] is None
+        assert session.request_headers[1] == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 01 Jan 2024",
+        }
+
+    def test_changed_body_replaces_cache(self):
+        session = FakeSession(responses=[
+            FakeResponse(200, [raw_market()], {"ETag": '"v1"'}),
+            FakeResponse(200, [], {"ETag": '"v2"'}),
+            FakeResponse(304),
+        ])
+        client = GammaClient(base_url="https://gamma.test")
+        client._session = session
+
+        for _ in range(3):
+            result = asyncio.run(client.fetch_markets(limit=10))
+
+        assert result == []
+        assert session.request_headers[2] == {"If-None-Match": '"v2"'}
+
+    def test_cache_is_per_query(self):
+        """Different params are validated independently"""
+        session = FakeSession(responses=[
+            FakeResponse(200, [1], {"ETag": '"a"'}),
+            FakeResponse(200, [2], {"ETag": '"b"'}),
+        ])
+        client = GammaClient(base_url="https://gamma.test")
+        client._session = session
+
+        asyncio.run(client.fetch_markets(limit=10))
+        asyncio.run(client.fetch_markets(limit=20))
+
+        assert session.request_headers == [None, None]
+
+
+class TestMarketsCache:
+    """Tests for the get_all_markets TTL cache"""
+
+    def test_repeat_call_within_ttl_skips_request(self):
+        session = FakeSession(responses=[FakeResponse(200, [raw_market()])])
+        client = GammaClient(base_url="https://gamma.test")
+        client._session = session
+
+        first = asyncio.run(client.get_all_markets(limit=10))
+        second = asyncio.run(client.get_binary_markets(limit=10))
+
+        assert len(session.request_headers) == 1
+        assert [m.market_id for m in second] == [m.market_id for m in first] == ["123"]
+
+    def test_partitioned_by_type(self):
+        negrisk = raw_market(
+            id=456, clobTokenIds='["a", "b", "c"]', outcomes='["A", "B", "C"]'
+        )
+        session = FakeSession(responses=[FakeResponse(200, [raw_market(), negrisk])])
+        client = GammaClient(base_url="https://gamma.test")
+        client._session = session
+
+        partitioned = asyncio.run(client.get_markets_partitioned(limit=10))
+
+        assert [m.market_id for m in partitioned[MarketType.BINARY]] == ["123"]
+        assert [m.market_id for m in partitioned[MarketType.NEGRISK]] == ["456"]
+
+    def test_expired_entry_is_refetched(self, monkeypatch):
+        monkeypatch.setattr(config.api, "markets_cache_ttl", 0)
+        session = FakeSession(responses=[
+            FakeResponse(200, [raw_market()]),
+            FakeResponse(200, []),
+        ])
+        client = GammaClient(base_url="https://gamma.test")
+        client._session = session
+
+        asyncio.run(client.get_all_markets(limit=10))
+        assert asyncio.run(client.get_all_markets(limit=10)) == []
+
+
+class TestSessionLifecycle:
+    """Tests for explicit connect/close"""
+
+    def test_close_keeps_injected_session_open(self):
+        session = FakeSession(responses=[])
+        client = GammaClient(session=session)
+
+        async def use():
+            await client.connect()
+            assert client.session is session
+            await client.close()
+
+        asyncio.run(use())
+        assert session.closed is False
+
+    def test_close_releases_owned_session(self):
+        async def use():
+            client = GammaClient()
+            await client.connect()
+            session = client.session
+            await client.close()
+            return client, session
+
+        client, session = asyncio.run(use())
+        assert session.closed
+        assert client._session is None
@@ -42,6 +42,13 @@ class TestOrderBookLevel:
         level = OrderBookLevel(price=0.0, size=1000)
         assert level.value == 0.0
 
+    def test_level_is_immutable(self):
+        """Levels are slotted value objects"""
+        level = OrderBookLevel(price=0.50, size=1000)
+        with pytest.raises(AttributeError):
+            level.price = 0.51
+        assert not hasattr(level, "__dict__")
+
 
 class TestOrderBook:
     """Tests for OrderBook"""
@@ -113,6 +120,12 @@ class TestMarket:
         assert market.is_multi_outcome is False
         assert len(market.tokens) == 2
 
+    def test_market_is_slotted(self, binary_market_with_arbitrage):
+        """Markets and their tokens carry no per-instance __dict__"""
+        market = binary_market_with_arbitrage
+        assert not hasattr(market, "__dict__")
+        assert not hasattr(market.tokens[0], "__dict__")
+
     def test_multi_outcome_detection(self):
         """Multi-outcome market has 3+ tokens"""
         market = Market(
@@ -215,6 +228,23 @@ class TestArbitrageOpportunity:
         assert d["profit_percent"] == 7.53
         assert len(d["question"]) == 100  # Truncated
 
+    def test_opportunity_is_immutable_and_hashable(self):
+        """Detected opportunities can't be mutated and can be deduped in a set"""
+        kwargs = dict(
+            market_id="0xabc", condition_id="c", question="Q", url="", category="",
+            arb_type=ArbitrageType.BINARY_UNDERPRICED,
+            market_type=MarketType.BINARY,
+            total_cost=0.93, profit=0.07, profit_percent=7.53,
+            tokens=[], liquidity=10000,
+        )
+        opp = ArbitrageOpportunity(**kwargs)
+
+        with pytest.raises(AttributeError):
+            opp.profit = 1.0
+
+        same = ArbitrageOpportunity(**kwargs, timestamp=opp.timestamp)
+        assert len({opp, same}) == 1
+
 
 class TestScanResult:
     """Tests for ScanResult model"""
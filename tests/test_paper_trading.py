@@ -310,6 +310,36 @@ class TestPaperTradingEngine:
         assert status["opportunities_executed"] == 1
         assert "runtime" in status
 
+    def test_get_status_matches_properties(self):
+        """The single-pass status agrees with the per-metric properties"""
+        engine = PaperTradingEngine(initial_balance=1000, position_size=100)
+
+        for i, (arb_type, price) in enumerate([
+            ("BINARY_UNDERPRICED", 0.97),
+            ("BINARY_OVERPRICED", 1.04),
+            ("BINARY_UNDERPRICED", 0.95),
+        ]):
+            engine.execute_opportunity({
+                "type": arb_type,
+                "market_id": f"0xtest{i}",
+                "question": "Test market",
+                "total_cost": price,
+                "total_value": price,
+                "liquidity": 50000,
+            })
+        # Closed at a loss, so drawdown is non-zero
+        next(iter(engine.positions.values())).actual_profit = -50
+
+        status = engine.get_status()
+
+        assert status["realized_pnl"] == pytest.approx(engine.realized_pnl)
+        assert status["unrealized_pnl"] == pytest.approx(engine.unrealized_pnl)
+        assert status["total_pnl"] == pytest.approx(engine.total_pnl)
+        assert status["return_percent"] == pytest.approx(engine.return_percent)
+        assert status["win_rate"] == pytest.approx(engine.win_rate)
+        assert status["max_drawdown"] == pytest.approx(engine.max_drawdown)
+        assert engine.max_drawdown > 0
+
     def test_get_summary(self):
         """get_summary returns exportable data"""
         engine = PaperTradingEngine(initial_balance=1000, position_size=100)
@@ -677,6 +707,30 @@ class TestRealisticSimulation:
         assert len(failures) == 1
         assert failures[0][1] == "execution_failed"
 
+    def test_failures_follow_engine_generator(self):
+        """Failure draws come from the engine's own generator, so seeding it replays them"""
+        opportunity = {
+            "type": "BINARY_UNDERPRICED",
+            "market_id": "0xtest",
+            "question": "Test",
+            "total_cost": 0.97,
+            "profit_percent": 3.09,
+            "liquidity": 50000,
+        }
+
+        outcomes = []
+        for _ in range(2):
+            engine = PaperTradingEngine(
+                initial_balance=10000,
+                position_size=10,
+                failure_rate=0.5,
+            )
+            engine._rng.seed(42)
+            outcomes.append([engine.execute_opportunity(opportunity) for _ in range(20)])
+
+        assert outcomes[0] == outcomes[1]
+        assert True in outcomes[0] and False in outcomes[0]
+
     def test_custom_liquidity_cap(self):
         """Custom liquidity cap is applied"""
         engine = PaperTradingEngine(
@@ -0,0 +1,173 @@
+"""
+Tests for ArbitrageScanner helpers that do not need the network.
+"""
+import asyncio
+import csv
+import pytest
+
+import sys
+sys.path.insert(0, "src")
+
+from polyarb.config import config
+from polyarb.models import ArbitrageOpportunity, ArbitrageType, Market, MarketType, Token
+from polyarb.scanner import ArbitrageScanner
+
+
+def make_opportunity(market_id: str, profit_percent: float = 7.53) -> ArbitrageOpportunity:
+    return ArbitrageOpportunity(
+        market_id=market_id,
+        condition_id="cond",
+        question="Test?",
+        url="https://polymarket.com/event/test",
+        category="crypto",
+        arb_type=ArbitrageType.BINARY_UNDERPRICED,
+        market_type=MarketType.BINARY,
+        total_cost=0.93,
+        profit=0.07,
+        profit_percent=profit_percent,
+        tokens=[],
+        liquidity=10000,
+    )
+
+
+def make_market(market_id: str, tokens) -> Market:
+    return Market(
+        market_id=market_id,
+        condition_id="cond",
+        question="Test?",
+        slug=market_id,
+        tokens=tokens,
+        liquidity=10000,
+        market_type=MarketType.BINARY,
+    )
+
+
+@pytest.fixture
+def scanner(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "log_file", str(tmp_path / "opps.csv"))
+    return ArbitrageScanner(enable_alerts=False)
+
+
+class TestPriceTokenIds:
+    """Tests for choosing the tokens priced over REST at startup"""
+
+    def test_fairly_quoted_market_is_still_priced(self):
+        """Gamma quotes summing to $1 do not hide an executable underpricing"""
+        market = make_market("m1", [
+            Token(token_id="yes_1", outcome="YES", price=0.50, best_ask=0.47),
+            Token(token_id="no_1", outcome="NO", price=0.50, best_ask=0.48),
+        ])
+
+        assert ArbitrageScanner._price_token_ids([market], []) == ["yes_1", "no_1"]
+
+    def test_negrisk_yes_tokens_are_deduplicated(self):
+        market = make_market("m1", [
+            Token(token_id="yes_1", outcome="YES"),
+            Token(token_id="no_1", outcome="NO"),
+        ])
+        other = make_market("m2", [
+            Token(token_id="yes_2", outcome="YES"),
+            Token(token_id="no_2", outcome="NO"),
+        ])
+        events = [{"markets": [market, other]}]
+
+        assert ArbitrageScanner._price_token_ids([market], events) == [
+            "yes_1", "no_1", "yes_2"
+        ]
+
+
+class TestCsvLogging:
+    """Tests for opportunity CSV logging"""
+
+    def test_log_file_has_header(self, scanner):
+        with open(scanner.log_file, newline="") as f:
+            rows = list(csv.reader(f))
+
+        assert rows[0][:3] == ["timestamp", "market_id", "question"]
+
+    def test_rows_appended_in_order(self, scanner):
+        """Opportunities are appended one row each, in order"""
+        for i in range(4):
+            scanner._log_opportunity(make_opportunity(f"m{i}"))
+
+        with open(scanner.log_file, newline="") as f:
+            rows = list(csv.reader(f))[1:]
+
+        assert [r[1] for r in rows] == ["m0", "m1", "m2", "m3"]
+        assert rows[0][3] == ArbitrageType.BINARY_UNDERPRICED.value
+
+    def test_logging_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "log_file", str(tmp_path / "off.csv"))
+        scanner = ArbitrageScanner(enable_alerts=False, enable_logging=False)
+
+        scanner._log_opportunity(make_opportunity("m0"))
+
+        assert not scanner.log_file.exists()
+
+    def test_writer_task_drains_queue(self, scanner):
+        """While running, rows go through the single writer task"""
+        async def session():
+            scanner._start_log_writer()
+            scanner._log_opportunity(make_opportunity("m0"))
+            scanner._log_row(ArbitrageScanner._ws_opportunity_row({
+                "type": "NEGRISK_UNDERPRICED",
+                "event_id": "e1",
+                "title": "Who wins?",
+                "total_cost": 0.9,
+                "profit": 0.1,
+                "profit_percent": 11.1,
+                "liquidity": 5000,
+                "url": "https://polymarket.com/event/who-wins",
+            }))
+            await scanner._stop_log_writer()
+
+        asyncio.run(session())
+
+        with open(scanner.log_file, newline="") as f:
+            rows = list(csv.reader(f))[1:]
+
+        assert [r[1] for r in rows] == ["m0", "e1"]
+        assert rows[1][3:5] == ["negrisk_underpriced", "negrisk"]
+        assert scanner._log_queue is None
+
+    def test_writer_task_batches_and_drops_on_full_queue(self, scanner, monkeypatch):
+        """Rows beyond the queue bound are counted and dropped, the rest written"""
+        monkeypatch.setattr("polyarb.scanner.LOG_QUEUE_SIZE", 100)
+
+        async def session():
+            scanner._start_log_writer()
+            # Queued synchronously, so the writer cannot drain in between
+            for i in range(120):
+                scanner._log_opportunity(make_opportunity(f"m{i}"))
+            await scanner._stop_log_writer()
+
+        asyncio.run(session())
+
+        with open(scanner.log_file, newline="") as f:
+            rows = list(csv.reader(f))[1:]
+
+        assert [r[1] for r in rows] == [f"m{i}" for i in range(100)]
+        assert scanner.log_rows_dropped == 20
+
+
+class TestClock:
+    """Tests for the cached detection timestamp"""
+
+    def test_formats_once_per_second(self, monkeypatch):
+        from polyarb import scanner as scanner_module
+
+        calls = []
+        real_strftime = scanner_module.time.strftime
+        monkeypatch.setattr(scanner_module, "_clock_second", None)
+        monkeypatch.setattr(
+            scanner_module.time, "strftime", lambda *a: calls.append(a) or real_strftime(*a)
+        )
+
+        stamps = []
+        for now in (1000.0421, 1000.5, 1000.999, 1001.25):
+            monkeypatch.setattr(scanner_module.time, "time", lambda now=now: now)
+            stamps.append(scanner_module._clock_ms())
+
+        assert len(calls) == 2
+        assert [s[-4:] for s in stamps] == [".042", ".500", ".999", ".250"]
+        assert stamps[0][:8] == real_strftime("%H:%M:%S", scanner_module.time.localtime(1000))
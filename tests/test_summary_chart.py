@@ -54,6 +54,22 @@ class TestSummaryChartGeneration:
 
             assert filepath.exists()
 
+    def test_save_from_worker_thread(self):
+        """save() runs off the main thread and leaves no pyplot figures open"""
+        import asyncio
+        import matplotlib.pyplot as plt
+
+        engine = PaperTradingEngine(initial_balance=10000)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "threaded.png"
+
+            chart = SummaryChart(engine)
+            asyncio.run(asyncio.to_thread(chart.save, str(filepath)))
+
+            assert filepath.read_bytes().startswith(b"\x89PNG")
+        assert plt.get_fignums() == []
+
     def test_chart_shows_key_metrics(self):
         """Chart includes key metrics in title/labels"""
         engine = PaperTradingEngine(
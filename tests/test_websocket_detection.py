@@ -3,15 +3,25 @@ Tests for WebSocket-based real-time arbitrage detection.
 
 Tests the RealtimeArbitrageDetector, MarketState, and NegRiskEventState classes.
 """
+import asyncio
+import json
+import logging
+import queue
+import random
+import numpy as np
 import pytest
 import sys
+from types import SimpleNamespace
 
 sys.path.insert(0, "src")
 
+from polyarb.api import websocket
 from polyarb.api.websocket import (
     MarketState,
     NegRiskEventState,
+    PriceTracker,
     RealtimeArbitrageDetector,
+    WebSocketClient,
 )
 
 
@@ -45,6 +55,26 @@ class TestMarketState:
         assert opp["profit"] == pytest.approx(0.07)
         assert opp["profit_percent"] == pytest.approx(7.53, rel=0.01)
 
+    def test_eval_then_payload_matches_check(self):
+        """The numeric check plus payload builder equal the one-shot check"""
+        state = MarketState(
+            market_id="test_market",
+            question="Test question?",
+            slug="test-question",
+            liquidity=50000.0,
+            category="crypto",
+            yes_token_id="yes_token",
+            no_token_id="no_token",
+            yes_ask=0.45,
+            no_ask=0.48,
+        )
+
+        result = state.eval_underpriced(min_profit=1.0)
+
+        assert result == pytest.approx((0.93, 0.07, 7.5268817))
+        assert state.underpriced_payload(*result) == state.check_underpriced(1.0)
+        assert state.eval_overpriced(min_profit=1.0) is None
+
     def test_no_underpriced_when_fair(self):
         """No opportunity when YES_ask + NO_ask >= $1"""
         state = MarketState(
@@ -101,6 +131,37 @@ class TestMarketState:
         opp = state.check_overpriced(min_profit=1.0)
         assert opp is None
 
+    def test_states_are_slotted(self):
+        """Market and event states carry no per-instance __dict__"""
+        market = MarketState(
+            market_id="m1",
+            question="Q?",
+            slug="q",
+            liquidity=1.0,
+            category="",
+            yes_token_id="yes",
+            no_token_id="no",
+        )
+        event = NegRiskEventState(event_id="e1", title="T", slug="t", total_liquidity=1.0)
+
+        assert not hasattr(market, "__dict__")
+        assert not hasattr(event, "__dict__")
+
+    def test_url_built_from_slug(self):
+        market = MarketState(
+            market_id="m1",
+            question="Q?",
+            slug="will-it-rain",
+            liquidity=1.0,
+            category="",
+            yes_token_id="yes",
+            no_token_id="no",
+        )
+        event = NegRiskEventState(event_id="e1", title="T", slug="", total_liquidity=1.0)
+
+        assert market.url == "https://polymarket.com/event/will-it-rain"
+        assert event.url == ""
+
     def test_update_price(self):
         """Test price updates via token_id"""
         state = MarketState(
@@ -317,6 +378,78 @@ class TestNegRiskEventState:
         assert state.yes_prices["yes_1"] == 0.20
         assert state.yes_bids["yes_1"] == 0.18
 
+    def test_update_ignores_unknown_tokens(self):
+        state = NegRiskEventState(
+            event_id="event_1", title="Test", slug="test", total_liquidity=100000.0
+        )
+        state.update_price("yes_1", bid=0.18, ask=0.20)
+        assert state.yes_prices == {}
+
+        state.add_market("m1", "yes_1", "A")
+        state.update_price("yes_1", bid=0.18, ask=0.20)
+        assert state.yes_prices == {"yes_1": 0.20}
+        assert state.yes_token_ids == {"yes_1"}
+
+    def test_running_totals_follow_updates(self):
+        """Totals track replaced prices without re-summing"""
+        state = NegRiskEventState(
+            event_id="event_1",
+            title="Test",
+            slug="test",
+            total_liquidity=100000.0,
+            markets={f"m{i}": (f"yes_{i}", str(i)) for i in range(3)},
+        )
+
+        for i in range(3):
+            state.update_price(f"yes_{i}", bid=0.30, ask=0.32)
+        state.update_price("yes_0", bid=None, ask=0.25)
+
+        assert state.ask_total == pytest.approx(sum(state.yes_prices.values()))
+        assert state.ask_total == pytest.approx(0.89)
+        assert state.bid_total == pytest.approx(0.90)
+        assert state.check_underpriced(min_profit=1.0)["total_cost"] == state.ask_total
+
+    def test_running_totals_do_not_drift(self):
+        """Many random updates leave the totals equal to the exact sums"""
+        rng = random.Random(7)
+        state = NegRiskEventState(
+            event_id="event_1",
+            title="Test",
+            slug="test",
+            total_liquidity=100000.0,
+            markets={f"m{i}": (f"yes_{i}", str(i)) for i in range(12)},
+        )
+
+        for _ in range(20 * NegRiskEventState.RESUM_EVERY):
+            bid, ask = rng.randrange(1, 100) / 100, rng.randrange(1, 100) / 100
+            state.update_price(f"yes_{rng.randrange(12)}", bid=bid, ask=ask)
+            assert abs(state.ask_total - sum(state.yes_prices.values())) < 1e-12
+            assert abs(state.bid_total - sum(state.yes_bids.values())) < 1e-12
+
+        # Just re-summed: exact
+        assert state.ask_total == sum(state.yes_prices.values())
+        assert state.bid_total == sum(state.yes_bids.values())
+
+    def test_resum_on_bid_update_also_resums_asks(self):
+        """The periodic re-sum covers both totals whichever side changed"""
+        state = NegRiskEventState(
+            event_id="event_1",
+            title="Test",
+            slug="test",
+            total_liquidity=100000.0,
+            markets={"m0": ("yes_0", "A"), "m1": ("yes_1", "B")},
+            yes_prices={"yes_0": 0.3, "yes_1": 0.4},
+            yes_bids={"yes_0": 0.2, "yes_1": 0.3},
+        )
+        # Simulate accumulated drift on the ask side
+        state.ask_total += 1e-9
+        state._updates = NegRiskEventState.RESUM_EVERY - 1
+
+        state.update_price("yes_0", bid=0.25, ask=None)
+
+        assert state.ask_total == sum(state.yes_prices.values())
+        assert state.bid_total == sum(state.yes_bids.values())
+
 
 # =============================================================================
 # RealtimeArbitrageDetector Tests
@@ -347,6 +480,65 @@ class TestRealtimeArbitrageDetector:
         assert "no_1" in detector.token_to_market
         assert detector.token_to_market["yes_1"] == "m1"
 
+    def test_registered_token_ids_are_interned(self):
+        """Token ids are interned once, when they are registered"""
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+        # Built at runtime so every call returns a fresh, non-interned object
+        def token(c):
+            return "".join(["7", "1" * 76, c])
+
+        yes_id, no_id, neg_id = token("y"), token("n"), token("x")
+
+        detector.register_binary_market(
+            market_id="m1",
+            question="Test?",
+            slug="test",
+            liquidity=50000.0,
+            category="crypto",
+            yes_token_id=yes_id,
+            no_token_id=no_id,
+        )
+        detector.register_negrisk_event(
+            event_id="e1",
+            title="Event",
+            slug="event",
+            total_liquidity=50000.0,
+            markets=[{"market_id": "n1", "yes_token_id": neg_id, "question": "A?"}],
+        )
+
+        state = detector.binary_markets["m1"]
+        assert state.yes_token_id is sys.intern(token("y"))
+        assert state.no_token_id is sys.intern(token("n"))
+        assert next(iter(detector.token_to_event)) is sys.intern(token("x"))
+
+    def test_token_routes_to_market_and_event(self):
+        """A token registered under both kinds updates both in one pass"""
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+
+        detector.register_binary_market(
+            market_id="m1",
+            question="Test?",
+            slug="test",
+            liquidity=50000.0,
+            category="crypto",
+            yes_token_id="yes_1",
+            no_token_id="no_1",
+        )
+        detector.register_negrisk_event(
+            event_id="e1",
+            title="Event",
+            slug="event",
+            total_liquidity=50000.0,
+            markets=[{"market_id": "m1", "yes_token_id": "yes_1", "question": "A?"}],
+        )
+
+        detector.apply_message({"asset_id": "yes_1", "best_ask": "0.40"})
+
+        assert detector.binary_markets["m1"].yes_ask == 0.40
+        assert detector.negrisk_events["e1"].yes_prices == {"yes_1": 0.40}
+        assert list(detector._dirty_binary) == ["m1"]
+        assert list(detector._dirty_negrisk) == ["e1"]
+
     def test_register_ignores_low_liquidity(self):
         """Markets below min_liquidity are ignored"""
         detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
@@ -408,6 +600,26 @@ class TestRealtimeArbitrageDetector:
         assert len(opportunities) >= 1
         assert any(o["type"] == "BINARY_UNDERPRICED" for o in opportunities)
 
+    def test_ask_update_reports_bid_side_opportunity(self):
+        """Every update checks both sides, not just the one that changed"""
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+
+        detector.register_binary_market(
+            market_id="m1",
+            question="Test?",
+            slug="test",
+            liquidity=50000.0,
+            category="crypto",
+            yes_token_id="yes_1",
+            no_token_id="no_1",
+            yes_bid=0.55,
+            no_bid=0.50,
+        )
+
+        opportunities = detector.process_message({"asset_id": "yes_1", "best_ask": "0.60"})
+
+        assert [o["type"] for o in opportunities] == ["BINARY_OVERPRICED"]
+
     def test_process_message_list(self):
         """Can process a list of messages"""
         detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
@@ -578,6 +790,55 @@ class TestRealtimeArbitrageDetector:
         opps3 = detector.process_message(message)
         assert len(opps3) >= 1
 
+    def test_seen_history_is_bounded(self):
+        """Oldest dedup keys are evicted once the history is full"""
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+        detector.max_seen = 3
+
+        detector.register_binary_market(
+            market_id="m1",
+            question="Test?",
+            slug="test",
+            liquidity=50000.0,
+            category="crypto",
+            yes_token_id="yes_1",
+            no_token_id="no_1",
+            no_ask=0.48,
+        )
+
+        for ask in ("0.40", "0.41", "0.42", "0.43"):
+            assert detector.process_message({"asset_id": "yes_1", "best_ask": ask})
+
+        assert len(detector.seen_opportunities) == 3
+        # The first key fell out, so that price is reported again
+        assert detector.process_message({"asset_id": "yes_1", "best_ask": "0.40"})
+
+    def test_seen_history_evicts_least_recently_seen(self):
+        """A key that keeps recurring is refreshed rather than evicted"""
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+        detector.max_seen = 2
+
+        detector.register_binary_market(
+            market_id="m1",
+            question="Test?",
+            slug="test",
+            liquidity=50000.0,
+            category="crypto",
+            yes_token_id="yes_1",
+            no_token_id="no_1",
+            no_ask=0.48,
+        )
+
+        assert detector.process_message({"asset_id": "yes_1", "best_ask": "0.40"})
+        assert detector.process_message({"asset_id": "yes_1", "best_ask": "0.41"})
+        # Seen again: 0.40 becomes the most recent key
+        assert not detector.process_message({"asset_id": "yes_1", "best_ask": "0.40"})
+        assert detector.process_message({"asset_id": "yes_1", "best_ask": "0.42"})
+
+        # 0.41 was evicted instead of 0.40
+        assert not detector.process_message({"asset_id": "yes_1", "best_ask": "0.40"})
+        assert detector.process_message({"asset_id": "yes_1", "best_ask": "0.41"})
+
 
 # =============================================================================
 # Edge Case Tests
@@ -598,6 +859,37 @@ class TestWebSocketEdgeCases:
         assert detector.process_message({}) == []
         assert detector.process_message({"no_asset_id": True}) == []
 
+    def test_extractors_match_generic_parse(self):
+        """Schema-specific extractors agree with the generic field probe"""
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+        messages = [
+            {
+                "event_type": "book",
+                "asset_id": "t1",
+                "bids": [{"price": "0.48", "size": "10"}],
+                "asks": [{"price": "0.52", "size": "10"}],
+            },
+            {"event_type": "book", "asset_id": "t1", "bids": [], "asks": ["bad"]},
+            {"event_type": "last_trade_price", "asset_id": "t1", "price": "0.51"},
+            {"event_type": "last_trade_price", "asset_id": "t1", "price": None},
+        ]
+
+        for message in messages:
+            assert detector._extract_prices(message) == detector._extract_generic(message)
+        assert detector._extract_prices(messages[0]) == (0.48, 0.52)
+
+    def test_book_best_last(self):
+        """A book listed best-last still yields the highest bid and lowest ask"""
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+        message = {
+            "event_type": "book",
+            "asset_id": "t1",
+            "bids": [{"price": p, "size": "10"} for p in ("0.44", "0.46", "0.48")],
+            "asks": [{"price": p, "size": "10"} for p in ("0.56", "0.54", "0.52")],
+        }
+
+        assert detector._extract_prices(message) == (0.48, 0.52)
+
     def test_unregistered_token(self):
         """Messages for unregistered tokens are ignored"""
         detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
@@ -637,6 +929,36 @@ class TestWebSocketEdgeCases:
         })
         assert detector.binary_markets["m1"].yes_ask == 0.43
 
+    def test_price_change_event_with_nested_assets(self):
+        """price_change events list per-asset best bid/ask under price_changes"""
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+
+        detector.register_binary_market(
+            market_id="m1",
+            question="Test?",
+            slug="test",
+            liquidity=50000.0,
+            category="crypto",
+            yes_token_id="yes_1",
+            no_token_id="no_1",
+        )
+
+        opps = detector.process_message({
+            "event_type": "price_change",
+            "market": "0xcond",
+            "price_changes": [
+                {"asset_id": "yes_1", "price": "0.44", "side": "BUY",
+                 "best_bid": "0.44", "best_ask": "0.45"},
+                {"asset_id": "no_1", "price": "0.47", "side": "BUY",
+                 "best_bid": "0.47", "best_ask": "0.48"},
+            ],
+        })
+
+        state = detector.binary_markets["m1"]
+        assert (state.yes_bid, state.yes_ask) == (0.44, 0.45)
+        assert (state.no_bid, state.no_ask) == (0.47, 0.48)
+        assert [o["type"] for o in opps] == ["BINARY_UNDERPRICED"]
+
     def test_simultaneous_underpriced_and_overpriced(self):
         """Market can be both underpriced and overpriced (wide spread)"""
         detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
@@ -662,3 +984,473 @@ class TestWebSocketEdgeCases:
 
         assert underpriced is not None
         assert overpriced is not None
+
+
+# =============================================================================
+# Full Scan Tests
+# =============================================================================
+
+
+class TestScanAll:
+    """Tests for the vectorized full scan"""
+
+    def _detector(self) -> RealtimeArbitrageDetector:
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+        prices = {
+            "fair": (0.50, 0.50, 0.49, 0.49),
+            "under": (0.45, 0.48, 0.44, 0.47),
+            "over": (0.60, 0.55, 0.58, 0.53),
+            "missing": (None, 0.40, None, None),
+        }
+        for market_id, (yes_ask, no_ask, yes_bid, no_bid) in prices.items():
+            detector.register_binary_market(
+                market_id=market_id,
+                question=f"{market_id}?",
+                slug=market_id,
+                liquidity=50000.0,
+                category="crypto",
+                yes_token_id=f"yes_{market_id}",
+                no_token_id=f"no_{market_id}",
+                yes_ask=yes_ask,
+                no_ask=no_ask,
+                yes_bid=yes_bid,
+                no_bid=no_bid,
+            )
+        return detector
+
+    def test_matches_per_market_checks(self):
+        """Vectorized screen returns exactly what the scalar checks find"""
+        detector = self._detector()
+
+        expected = []
+        for state in detector.binary_markets.values():
+            for check in (state.check_underpriced, state.check_overpriced):
+                opp = check(detector.min_profit)
+                if opp:
+                    expected.append(opp)
+
+        assert detector.scan_all() == expected
+        assert [o["market_id"] for o in expected] == ["under", "over"]
+
+    def test_price_columns_use_nan_for_missing(self):
+        cols = self._detector().binary_price_columns()
+
+        assert len(cols["states"]) == 4
+        assert cols["yes_ask"][0] == 0.50
+        assert np.isnan(cols["yes_ask"][3])
+
+    def test_does_not_mark_seen(self):
+        detector = self._detector()
+        detector.scan_all()
+
+        assert len(detector.seen_opportunities) == 0
+
+    def test_empty_detector(self):
+        assert RealtimeArbitrageDetector().scan_all() == []
+
+    def test_negrisk_events_match_per_event_checks(self):
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+        events = {
+            "cheap": [0.30, 0.25, 0.20, 0.15],
+            "rich": [0.40, 0.35, 0.30],
+            "fair": [0.34, 0.33, 0.33],
+            "short": [0.20, 0.20],
+        }
+        for event_id, prices in events.items():
+            detector.register_negrisk_event(
+                event_id=event_id,
+                title=event_id,
+                slug=event_id,
+                total_liquidity=50000.0,
+                markets=[
+                    {
+                        "market_id": f"{event_id}_{i}",
+                        "yes_token_id": f"{event_id}_yes_{i}",
+                        "question": "?",
+                        "yes_ask": p,
+                        "yes_bid": p,
+                    }
+                    for i, p in enumerate(prices)
+                ],
+            )
+
+        expected = []
+        for state in detector.negrisk_events.values():
+            for check in (state.check_underpriced, state.check_overpriced):
+                opp = check(detector.min_profit)
+                if opp:
+                    expected.append(opp)
+
+        found = detector.scan_all()
+        assert found == expected
+        assert [(o["event_id"], o["type"]) for o in found] == [
+            ("cheap", "NEGRISK_UNDERPRICED"),
+            ("rich", "NEGRISK_OVERPRICED"),
+        ]
+
+
+class TestScanDirty:
+    """Tests for deferred apply_message / scan_dirty detection"""
+
+    def _detector(self) -> RealtimeArbitrageDetector:
+        detector = RealtimeArbitrageDetector(min_profit_percent=1.0, min_liquidity=1000)
+        for market_id in ("m1", "m2"):
+            detector.register_binary_market(
+                market_id=market_id,
+                question=f"{market_id}?",
+                slug=market_id,
+                liquidity=50000.0,
+                category="crypto",
+                yes_token_id=f"yes_{market_id}",
+                no_token_id=f"no_{market_id}",
+                yes_ask=0.50,
+                no_ask=0.50,
+            )
+        return detector
+
+    def test_burst_checked_once_per_market(self):
+        detector = self._detector()
+        found = []
+        detector.on_opportunity = found.append
+
+        detector.apply_message({"asset_id": "yes_m1", "best_ask": "0.47"})
+        detector.apply_message([
+            {"asset_id": "yes_m1", "best_ask": "0.45"},
+            {"asset_id": "no_m2", "best_ask": "0.499"},
+        ])
+        assert found == []
+
+        opps = detector.scan_dirty()
+
+        assert [(o["market_id"], o["yes_ask"]) for o in opps] == [("m1", 0.45)]
+        assert found == opps
+        assert detector.messages_processed == 2
+
+    def test_dirty_set_is_cleared(self):
+        detector = self._detector()
+        detector.apply_message({"asset_id": "yes_m1", "best_ask": "0.45"})
+
+        assert len(detector.scan_dirty()) == 1
+        assert detector.scan_dirty() == []
+
+    def test_repeat_opportunity_is_deduplicated(self):
+        detector = self._detector()
+        detector.apply_message({"asset_id": "yes_m1", "best_ask": "0.45"})
+        detector.scan_dirty()
+        detector.apply_message({"asset_id": "no_m1", "best_ask": "0.50"})
+
+        assert detector.scan_dirty() == []
+
+    def test_checks_dirty_states_without_vectorized_screen(self, monkeypatch):
+        """Bursts are checked directly; the numpy screen is for scan_all"""
+        detector = self._detector()
+
+        def fail(*args):
+            raise AssertionError("scan_dirty used the vectorized screen")
+
+        monkeypatch.setattr(detector, "_scan", fail)
+        detector.apply_message({"asset_id": "yes_m1", "best_ask": "0.45"})
+
+        assert [o["market_id"] for o in detector.scan_dirty()] == ["m1"]
+
+    def test_checks_both_sides_of_dirty_state(self):
+        """An ask-only update still reports a standing overpriced market"""
+        detector = self._detector()
+        state = detector.binary_markets["m2"]
+        state.yes_bid, state.no_bid = 0.55, 0.50
+
+        detector.apply_message({"asset_id": "yes_m2", "best_ask": "0.60"})
+
+        assert [o["type"] for o in detector.scan_dirty()] == ["BINARY_OVERPRICED"]
+
+
+# =============================================================================
+# WebSocketClient Frame Batching Tests
+# =============================================================================
+
+
+class FakeConnection:
+    """Connection whose recv() returns buffered frames, then waits"""
+
+    def __init__(self, frames=()):
+        self.frames = list(frames)
+        # Mirrors the receive buffer websockets exposes to _drain_batch
+        self.recv_messages = SimpleNamespace(frames=self.frames)
+        self.sent = []
+        self.closed = False
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def close(self):
+        self.closed = True
+
+    async def recv(self, decode=None):
+        if self.frames:
+            frame = self.frames.pop(0)
+            # decode=False hands text frames over as UTF-8 bytes
+            if decode is False and isinstance(frame, str):
+                return frame.encode()
+            return frame
+        await asyncio.Event().wait()
+
+
+class TestConnect:
+    """Tests for WebSocketClient.connect"""
+
+    def connect(self, monkeypatch, client, token_ids=None):
+        conn = FakeConnection()
+
+        async def fake_connect(url, **kwargs):
+            conn.options = kwargs
+            return conn
+
+        monkeypatch.setattr(websocket.websockets, "connect", fake_connect)
+        asyncio.run(client.connect(token_ids))
+        return conn
+
+    def test_subscribes_with_handshake(self, monkeypatch):
+        client = WebSocketClient(url="wss://example.invalid")
+        conn = self.connect(monkeypatch, client, ["t1", "t2"])
+
+        assert [json.loads(m) for m in conn.sent] == [
+            {"type": "MARKET", "assets_ids": ["t1", "t2"]}
+        ]
+
+    def test_reconnect_resubscribes(self, monkeypatch):
+        client = WebSocketClient(url="wss://example.invalid")
+        self.connect(monkeypatch, client, ["t1"])
+        conn = self.connect(monkeypatch, client)
+
+        assert [json.loads(m)["assets_ids"] for m in conn.sent] == [["t1"]]
+
+    def test_subscription_frame_is_reused(self, monkeypatch):
+        client = WebSocketClient(url="wss://example.invalid")
+        first = self.connect(monkeypatch, client, ["t1", "t2"])
+        second = self.connect(monkeypatch, client)
+
+        assert second.sent[0] is first.sent[0]
+
+    def test_connection_options(self, monkeypatch):
+        conn = self.connect(monkeypatch, WebSocketClient(url="wss://example.invalid"))
+
+        assert conn.options["compression"] is None
+        assert conn.options["ping_interval"] is None
+        assert conn.options["max_size"] == 1 << 20
+        assert conn.options["max_queue"] == 1024
+
+    def test_no_tokens_sends_nothing(self, monkeypatch):
+        conn = self.connect(monkeypatch, WebSocketClient(url="wss://example.invalid"))
+
+        assert conn.sent == []
+
+
+class TestCallbackDispatch:
+    """Tests for the WebSocketClient callback dispatcher"""
+
+    def test_dispatch_follows_callbacks(self):
+        client = WebSocketClient(url="wss://example.invalid")
+        seen = []
+        first, second = seen.append, lambda data: seen.append(("second", data))
+
+        assert client._dispatch is None
+        client.add_callback(first)
+        client._dispatch(1)
+        client.add_callback(second)
+        client._dispatch(2)
+        client.remove_callback(first)
+        client._dispatch(3)
+        client.remove_callback(second)
+
+        assert seen == [1, 2, ("second", 2), ("second", 3)]
+        assert client._dispatch is None
+
+    def test_failing_callback_does_not_stop_others(self):
+        client = WebSocketClient(url="wss://example.invalid")
+        seen = []
+
+        def broken(data):
+            raise ValueError("boom")
+
+        client.add_callback(broken)
+        client.add_callback(seen.append)
+        client._dispatch({"a": 1})
+
+        assert seen == [{"a": 1}]
+
+
+class TestIdleConnection:
+    """Tests for WebSocketClient idle handling"""
+
+    def test_idle_connection_is_pinged(self):
+        client = WebSocketClient(url="wss://example.invalid")
+        client._ws = conn = FakeConnection()
+
+        asyncio.run(client._on_idle())
+
+        assert conn.sent == ["PING"]
+        assert client._ws is conn
+
+    def test_silent_connection_is_dropped(self):
+        client = WebSocketClient(url="wss://example.invalid")
+        client._ws = conn = FakeConnection()
+        client._last_frame -= client._max_silence + 1
+
+        asyncio.run(client._on_idle())
+
+        assert conn.sent == []
+        assert conn.closed
+        assert client._ws is None
+
+    def test_frame_resets_silence_clock(self):
+        client = WebSocketClient(url="wss://example.invalid")
+        client._ws = FakeConnection(["PONG"])
+        client._last_frame -= client._max_silence + 1
+
+        asyncio.run(client._drain_batch())
+        asyncio.run(client._on_idle())
+
+        assert client._ws is not None
+
+
+class TestLogQueue:
+    """Tests for the non-blocking WebSocket log handler"""
+
+    def test_full_queue_drops_records(self):
+        records = queue.Queue(maxsize=1)
+        handler = websocket._DroppingQueueHandler(records)
+        log = logging.getLogger("polyarb.ws.test")
+        log.addHandler(handler)
+        log.propagate = False
+        try:
+            log.warning("first")
+            log.warning("second")
+        finally:
+            log.removeHandler(handler)
+
+        assert records.qsize() == 1
+        assert records.get_nowait().getMessage() == "first"
+
+    def test_client_does_not_configure_logging(self):
+        """Creating a client leaves the logger to the application"""
+        log = logging.getLogger("polyarb.ws")
+        handlers, level, propagate = list(log.handlers), log.level, log.propagate
+
+        WebSocketClient(url="wss://example.invalid")
+
+        assert log.handlers == handlers
+        assert log.level == level
+        assert log.propagate is propagate is True
+
+
+class TestDrainBatch:
+    """Tests for WebSocketClient._drain_batch"""
+
+    def drain(self, frames, max_batch=64):
+        client = WebSocketClient(url="wss://example.invalid")
+        client._ws = FakeConnection(frames)
+        batch = asyncio.run(client._drain_batch(max_batch))
+        return batch, client._ws.frames
+
+    def test_drains_buffered_frames(self):
+        """All buffered frames are decoded in one batch"""
+        batch, left = self.drain(['{"a": 1}', b'{"a": 2}', '[{"a": 3}]'])
+
+        assert batch == [{"a": 1}, {"a": 2}, [{"a": 3}]]
+        assert left == []
+
+    def test_respects_max_batch(self):
+        batch, left = self.drain(['{"a": 1}', '{"a": 2}', '{"a": 3}'], max_batch=2)
+
+        assert batch == [{"a": 1}, {"a": 2}]
+        assert left == ['{"a": 3}']
+
+    def test_non_ascii_frames_decode_from_bytes(self):
+        batch, _ = self.drain(['{"title": "Élection présidentielle"}'])
+
+        assert batch == [{"title": "Élection présidentielle"}]
+
+    def test_listen_batch_yields_burst_and_runs_callbacks(self):
+        client = WebSocketClient(url="wss://example.invalid")
+        client._ws = FakeConnection(["PONG", '{"a": 1}', '[{"a": 2}]'])
+        client._running = True
+        seen = []
+        client.add_callback(seen.append)
+
+        async def first_batch():
+            async for batch in client.listen_batch():
+                return batch
+
+        batch = asyncio.run(first_batch())
+
+        assert batch == [{"a": 1}, [{"a": 2}]]
+        assert seen == batch
+
+    def test_skips_non_json_frames(self):
+        batch, _ = self.drain(["PONG", '{"a": 1}'])
+
+        assert batch == [{"a": 1}]
+
+    def test_lone_frame_is_a_single_recv(self):
+        """Nothing buffered: return after the first frame, no probing"""
+        client = WebSocketClient(url="wss://example.invalid")
+        client._ws = conn = FakeConnection(['{"a": 1}'])
+        calls = []
+        recv = conn.recv
+
+        async def counting_recv(decode=None):
+            calls.append(decode)
+            return await recv(decode)
+
+        conn.recv = counting_recv
+
+        assert asyncio.run(client._drain_batch()) == [{"a": 1}]
+        assert calls == [False]
+
+    def test_without_buffer_info_takes_one_frame(self):
+        client = WebSocketClient(url="wss://example.invalid")
+        client._ws = conn = FakeConnection(['{"a": 1}', '{"a": 2}'])
+        del conn.recv_messages
+
+        assert asyncio.run(client._drain_batch()) == [{"a": 1}]
+        assert conn.frames == ['{"a": 2}']
+
+
+# =============================================================================
+# PriceTracker Tests
+# =============================================================================
+
+
+class TestPriceTracker:
+    """Tests for PriceTracker"""
+
+    def test_tracks_price_and_freshness(self):
+        tracker = PriceTracker()
+        tracker.update({"asset_id": "t1", "price": "0.42"})
+
+        assert tracker.get_price("t1") == 0.42
+        assert not tracker.is_stale("t1", max_age_seconds=60)
+        assert tracker.is_stale("t1", max_age_seconds=-1)
+        assert tracker.is_stale("unknown")
+
+    def test_nested_price_changes(self):
+        tracker = PriceTracker()
+        tracker.update({
+            "event_type": "price_change",
+            "price_changes": [
+                {"asset_id": "t1", "price": "0.40"},
+                {"asset_id": "t2", "price": "0.61"},
+            ],
+        })
+
+        assert tracker.get_all_prices() == {"t1": 0.40, "t2": 0.61}
+
+    def test_list_message_keeps_latest_price(self):
+        tracker = PriceTracker()
+        tracker.update([
+            {"asset_id": "t1", "price": "0.40"},
+            {"asset_id": "t1", "price": "0.41"},
+            {"asset_id": "t1", "price": "bad"},
+        ])
+
+        assert tracker.get_all_prices() == {"t1": 0.41}